@@ -3,7 +3,7 @@ from flask_login import LoginManager, login_user, logout_user, login_required, U
 from flask_socketio import SocketIO, emit
 from flask_wtf.csrf import CSRFProtect, CSRFError
 from bedrock_simple import BedrockSimpleClient
-from bedrock_remote import BedrockRemoteClient
+from bedrock_remote import BedrockRemoteClient, PLAYER_JOIN_RE
 from scheduler import TaskScheduler
 from config import get_config
 import os
@@ -11,9 +11,13 @@ from dotenv import load_dotenv
 from datetime import datetime
 import re
 import json
-from threading import Thread
+import logging
+import atexit
+from threading import Thread, Lock, Event
 import time
-from functools import wraps
+from functools import wraps, lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 
 # Optional rate limiting
 try:
@@ -23,19 +27,40 @@ try:
 except ImportError:
     LIMITER_AVAILABLE = False
 
+# Optional fast JSON serialization (Rust-backed, emits UTF-8 directly)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 load_dotenv()
 
-# Validation helpers
+log = logging.getLogger(__name__)
+
+# Validation helpers (precompiled - these run on nearly every API request)
+_NAME_RE = re.compile(r'\A[A-Za-z0-9_]+\Z')
+_ITEM_RE = re.compile(r'\A[a-z_]+\Z')
+_REASON_SANITIZE_RE = re.compile(r'[^\w\s\-]')
+# Welcome-kit line: "item_name [amount] [zoom_level_for_maps]"
+_KIT_LINE_RE = re.compile(r'\A(\S+)(?:\s+(\d+))?(?:\s+(\d+))?\s*\Z')
+# Legacy welcome-kit commands: "give @a[tag=!welcomed] item [amount] [zoom]"
+_GIVE_RE = re.compile(r'give @a\[tag=!welcomed\] (\S+)(?: (\d+))?(?: (\d+))?')
+
 def validate_minecraft_name(name):
     """Validate Minecraft username (3-16 chars, alphanumeric and underscore only)"""
-    if not name or not isinstance(name, str):
+    if not isinstance(name, str) or not (3 <= len(name) <= 16):
         return False
-    if len(name) < 3 or len(name) > 16:
+    # Fast rejection: a single C-level isalnum scan throws out most invalid
+    # input without entering the regex engine (all-underscore names pass
+    # through to the regex, which remains authoritative)
+    stripped = name.replace('_', '')
+    if stripped and not stripped.isalnum():
         return False
-    return bool(re.match(r'^[a-zA-Z0-9_]+$', name))
+    return bool(_NAME_RE.match(name))
 
 # Common Minecraft items for Welcome Kit
-COMMON_WELCOME_ITEMS = {
+COMMON_WELCOME_ITEMS = frozenset({
     'map', 'filled_map', 'compass', 'bread', 'apple', 'cooked_beef',
     'wooden_pickaxe', 'wooden_axe', 'wooden_sword', 'wooden_shovel',
     'stone_pickaxe', 'stone_axe', 'stone_sword', 'stone_shovel',
@@ -43,7 +68,10 @@ COMMON_WELCOME_ITEMS = {
     'oak_log', 'cobblestone', 'torch', 'bed', 'crafting_table',
     'chest', 'stick', 'coal', 'iron_ingot', 'diamond', 'gold_ingot',
     'boat', 'shield', 'bucket', 'water_bucket', 'fishing_rod'
-}
+})
+
+# Map-type items that carry an optional zoom level in give commands
+MAP_ITEMS = frozenset({'filled_map', 'map'})
 
 # Valid Minecraft effects
 VALID_EFFECTS = {
@@ -54,6 +82,12 @@ VALID_EFFECTS = {
     'poison', 'wither', 'health_boost', 'absorption', 'saturation'
 }
 
+# Valid gamemodes (full names, short forms, and numeric aliases)
+VALID_GAMEMODES = frozenset({
+    'survival', 'creative', 'adventure', 'spectator',
+    's', 'c', 'a', 'sp', '0', '1', '2', '3'
+})
+
 # Valid gamerules
 VALID_GAMERULES = {
     'commandBlockOutput', 'commandBlocksEnabled', 'doDaylightCycle',
@@ -67,6 +101,28 @@ VALID_GAMERULES = {
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 
+# Use orjson for all jsonify responses / request JSON parsing when available.
+# Subclassing DefaultJSONProvider keeps Flask's fallback serializer for types
+# orjson doesn't know natively (datetime, Decimal, etc.).
+if ORJSON_AVAILABLE:
+    from flask.json.provider import DefaultJSONProvider
+
+    class ORJSONProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default,
+                                option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
+# Compact separators and insertion-order keys for all JSON responses -
+# pretty-printing and key sorting only burn CPU and bytes on API payloads
+# (orjson already emits compact/unsorted; this covers the stdlib fallback)
+app.json.compact = True
+app.json.sort_keys = False
+
 # Load configuration first so we can use secure secret key
 config = get_config()
 
@@ -92,7 +148,10 @@ app.config['SESSION_COOKIE_SECURE'] = os.getenv('SESSION_COOKIE_SECURE', 'false'
 cors_origins = os.getenv('CORS_ORIGINS', None) or None  # None = same origin only
 if cors_origins == '*':
     print("⚠️  WARNING: CORS_ORIGINS='*' allows any origin. Set to specific domain in production.")
-socketio = SocketIO(app, cors_allowed_origins=cors_origins if cors_origins else [])
+# async_mode left at 'eventlet' autodetection's explicit equivalent so the
+# gunicorn eventlet worker and local `python app.py` runs agree
+socketio = SocketIO(app, cors_allowed_origins=cors_origins if cors_origins else [],
+                    async_mode='eventlet')
 
 # =============================================================================
 # CSRF Protection
@@ -131,7 +190,7 @@ class User(UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    admin_user = config.get('admin.username', 'admin')
+    admin_user = _config_cache['admin_user']
     if user_id == admin_user:
         return User(user_id)
     return None
@@ -140,22 +199,54 @@ def load_user(user_id):
 def setup_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not config.is_setup_completed() and request.endpoint != 'setup' and not request.path.startswith('/static'):
+        if not _setup_done and request.endpoint != 'setup' and not request.path.startswith('/static'):
             return redirect(url_for('setup'))
         return f(*args, **kwargs)
     return decorated_function
 
+# Setup state cached as a plain bool - the before_request hook runs on every
+# single request, and once setup completes the flag never flips back
+_setup_done = config.is_setup_completed()
+
 # Apply setup_required to all routes except setup
+# Endpoints the setup redirect must leave alone; None covers unmatched
+# routes so pre-setup 404s stay 404s instead of bouncing to /setup
+_SKIP_ENDPOINTS = frozenset({'setup', 'static', None})
+
 @app.before_request
 def check_setup():
-    if not config.is_setup_completed() and request.endpoint not in ['setup', 'static'] and not request.path.startswith('/static'):
-        if request.endpoint != 'setup':
-            return redirect(url_for('setup'))
+    # After setup the cached bool short-circuits everything; before it,
+    # the endpoint check covers /static/* (the router has already matched
+    # by the time before_request runs), so no path prefix test is needed
+    if _setup_done or request.endpoint in _SKIP_ENDPOINTS:
+        return
+    return redirect(url_for('setup'))
+
+# Cached config snapshot - avoids walking the nested config dict (and
+# re-splitting dotted keys) on every request. Refreshed whenever the config
+# changes (setup, connection settings, map settings, admin credentials).
+_config_cache = {'server_host': '127.0.0.1', 'map_url': '', 'admin_user': 'admin'}
+
+def refresh_config_cache():
+    """Re-resolve frequently read config values into the module-level cache"""
+    _config_cache['server_host'] = config.get('server.server_host', '127.0.0.1')
+    _config_cache['map_url'] = config.get('map.url', '')
+    _config_cache['admin_user'] = config.get('admin.username', 'admin')
+
+# SSH key resolved once at import - expanduser and the stat don't need
+# repeating on every client reinit (adding/removing the key means
+# restarting the panel anyway)
+_SSH_KEY_PATH = os.path.expanduser('~/.ssh/minecraft_panel_rsa')
+_HAS_SSH_KEY = os.path.exists(_SSH_KEY_PATH)
+
+# Connection fields the client is actually built from - if a config save
+# didn't touch these, the existing client (and its warm SSH shell) is kept
+_client_sig = None
 
 # Initialize Bedrock client
 def initialize_bedrock_client():
     """Initialize or reinitialize the Bedrock client with current config"""
-    global bedrock_client, task_scheduler
+    global bedrock_client, task_scheduler, _client_sig
 
     server_config = config.get_server_config()
     container_name = server_config.get('container_name', 'minecraft-bedrock')
@@ -163,33 +254,168 @@ def initialize_bedrock_client():
     ssh_host = server_config.get('ssh_host', 'localhost')
     ssh_user = server_config.get('ssh_user', 'admin')
 
-    ssh_key_path = os.path.expanduser('~/.ssh/minecraft_panel_rsa')
-    if os.path.exists(ssh_key_path):
+    sig = (container_name, server_host, ssh_host, ssh_user)
+    existing = globals().get('bedrock_client')
+    if existing is not None and sig == _client_sig:
+        refresh_config_cache()
+        return existing
+
+    # Tear down the previous client's SSH plumbing before replacing it
+    if existing is not None and hasattr(existing, 'close'):
+        existing.close()
+
+    if _HAS_SSH_KEY:
         print(f"SSH key found, using remote client for {server_host} (SSH to {ssh_user}@{ssh_host})")
         bedrock_client = BedrockRemoteClient(server_host, container_name, ssh_host=ssh_host, ssh_user=ssh_user)
     else:
         print("No SSH key found, using simple client (limited functionality)")
         bedrock_client = BedrockSimpleClient(server_host, container_name)
 
+    _client_sig = sig
+    refresh_config_cache()
     return bedrock_client
 
 # Initialize client
 bedrock_client = initialize_bedrock_client()
 
-# Initialize scheduler
+# Close the shared shell and SSH control master on interpreter exit
+# (ControlPersist would reap the master eventually, but exiting cleanly
+# doesn't leave orphaned sockets in /tmp)
+atexit.register(lambda: hasattr(bedrock_client, 'close') and bedrock_client.close())
+
+# Initialize scheduler. Every worker process imports this module, so under a
+# multi-worker server N schedulers would race to execute the same tasks and
+# issue duplicate SSH commands - set RUN_SCHEDULER=0 on all but one worker.
+# The default single-worker deployment runs it as before.
 task_scheduler = TaskScheduler(bedrock_client)
-task_scheduler.start()
+# Flush any debounced task write still pending at interpreter exit; the
+# write timer is a daemon thread and dies without firing
+atexit.register(task_scheduler.stop)
+if os.getenv('RUN_SCHEDULER', '1') == '1':
+    task_scheduler.start()
+
+# Event-driven welcome kit: instead of waking the scheduler every 30
+# seconds to give to (usually) nobody, follow the container log and fire
+# the kit only when a player actually joins. The @a[tag=!welcomed]
+# selector remains the idempotent guard, so a duplicate trigger is a no-op.
+_kit_watcher = {'thread': None, 'stop': None, 'stream': None}
+
+def _run_kit_watcher(stop):
+    while not stop.is_set():
+        stream = bedrock_client.open_log_stream()
+        if stream is None:
+            return  # no log access (simple client) - nothing to watch
+        _kit_watcher['stream'] = stream
+        try:
+            for line in stream.stdout:
+                if stop.is_set():
+                    break
+                if not PLAYER_JOIN_RE.search(line):
+                    continue
+                _, task = task_scheduler.get_task_by_name('Welcome Kit')
+                if task is None or not task.get('enabled', True):
+                    continue
+                commands = [c.strip() for c in task['command'].split(' && ') if c.strip()]
+                bedrock_client.send_commands(commands)
+        finally:
+            try:
+                stream.kill()
+            except Exception:
+                pass
+        # Stream dropped (container restart, SSH hiccup) - back off, re-follow
+        stop.wait(5)
+
+def start_kit_watcher():
+    """Start the player-join log watcher (idempotent)"""
+    if _kit_watcher['thread'] is not None and _kit_watcher['thread'].is_alive():
+        return
+    stop = Event()
+    thread = Thread(target=_run_kit_watcher, args=(stop,), daemon=True)
+    _kit_watcher['stop'] = stop
+    _kit_watcher['thread'] = thread
+    thread.start()
+
+def stop_kit_watcher():
+    """Signal the watcher to exit and unblock its log read"""
+    if _kit_watcher['stop'] is not None:
+        _kit_watcher['stop'].set()
+    if _kit_watcher['stream'] is not None:
+        try:
+            _kit_watcher['stream'].kill()
+        except Exception:
+            pass
+
+if os.getenv('RUN_SCHEDULER', '1') == '1':
+    if task_scheduler.get_task_by_name('Welcome Kit')[1] is not None:
+        start_kit_watcher()
 
 def execute_bedrock_command(command):
     """Execute Bedrock console command and return response"""
     # Use the new method that retrieves output from logs
     result = bedrock_client.send_command_with_output(command)
-    print(f"Command: {command}, Result: {result}", flush=True)
+    # Lazy %-formatting: no string is built unless DEBUG logging is on,
+    # and %.200s keeps huge response dicts out of the log
+    log.debug("Command: %s, Result: %.200s", command, result)
     return result
 
+# Stale-while-revalidate cache for quasi-static data (whitelist, ops and
+# backup lists change minutes apart while dashboards poll every few seconds):
+# fresh hits return immediately, aging entries are served stale while a
+# background refresh runs, and anything older than `stale` refetches inline
+_swr_pool = ThreadPoolExecutor(max_workers=2)
+
+def swr_cache(ttl=15, stale=300):
+    def decorator(fn):
+        cache = {}
+
+        def _refresh():
+            cache['value'] = (fn(), time.time())
+
+        @wraps(fn)
+        def wrapper():
+            entry = cache.get('value')
+            if entry:
+                value, ts = entry
+                age = time.time() - ts
+                if age < ttl:
+                    return value
+                if age < stale:
+                    _swr_pool.submit(_refresh)
+                    return value
+            _refresh()
+            return cache['value'][0]
+
+        wrapper.invalidate = cache.clear
+        return wrapper
+    return decorator
+
+@swr_cache()
+def fetch_whitelist():
+    return bedrock_client.get_whitelist()
+
+@swr_cache()
+def fetch_ops():
+    return bedrock_client.get_ops()
+
+@swr_cache()
+def fetch_backups():
+    return bedrock_client.list_backups()
+
+def extract_player(data):
+    """Pull and validate the 'player' field from a JSON payload in one pass.
+
+    Returns (player, error_response); exactly one of the two is set.
+    """
+    player = (data.get('player') or '').strip()
+    if not player:
+        return None, jsonify({'success': False, 'error': 'No player specified'})
+    if not validate_minecraft_name(player):
+        return None, jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
+    return player, None
+
 def get_server_host():
-    """Get current server host from config"""
-    return config.get('server.server_host', '127.0.0.1')
+    """Get current server host from the cached config snapshot"""
+    return _config_cache['server_host']
 
 @app.route('/')
 @login_required
@@ -214,7 +440,7 @@ def players_page():
 @app.route('/worlds')
 @login_required
 def worlds_page():
-    return render_template('worlds.html', rcon_host=get_server_host(), map_url=config.get('map.url', ''))
+    return render_template('worlds.html', rcon_host=get_server_host(), map_url=_config_cache['map_url'])
 
 @app.route('/performance')
 @login_required
@@ -248,28 +474,32 @@ def setup():
         return redirect(url_for('index'))
 
     if request.method == 'POST':
-        # Get form data
+        # Get form data (bind the parsed form once; each request.form
+        # access goes through a werkzeug property)
+        form = request.form
         server_config = {
-            'connection_type': request.form.get('connection_type'),
-            'ssh_host': request.form.get('ssh_host', ''),
-            'ssh_user': request.form.get('ssh_user', ''),
-            'container_name': request.form.get('container_name'),
-            'server_host': request.form.get('server_host')
+            'connection_type': form.get('connection_type'),
+            'ssh_host': form.get('ssh_host', ''),
+            'ssh_user': form.get('ssh_user', ''),
+            'container_name': form.get('container_name'),
+            'server_host': form.get('server_host')
         }
 
         admin_config = {
-            'username': request.form.get('admin_user'),
-            'password': request.form.get('admin_pass')
+            'username': form.get('admin_user'),
+            'password': form.get('admin_pass')
         }
 
         # Validate passwords match
-        password_confirm = request.form.get('admin_pass_confirm')
+        password_confirm = form.get('admin_pass_confirm')
         if admin_config['password'] != password_confirm:
             return render_template('setup.html', error="Passwords do not match")
 
         # Save configuration (with validation)
         success, error = config.complete_setup(server_config, admin_config)
         if success:
+            global _setup_done
+            _setup_done = True
             # Reinitialize bedrock client with new config
             initialize_bedrock_client()
             return redirect(url_for('login'))
@@ -281,19 +511,22 @@ def setup():
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
-        username = request.form.get('username')
-        password = request.form.get('password')
-
-        admin_user = config.get('admin.username', 'admin')
-
-        # Use secure password verification
-        if username == admin_user and config.verify_admin_password(password):
+        form = request.form
+        username = form.get('username')
+        password = form.get('password')
+
+        admin_user = _config_cache['admin_user']
+
+        # Verify the password unconditionally so response timing doesn't
+        # leak whether the username exists; bcrypt's compare is already
+        # constant-time, and the rate limiter caps brute-force attempts,
+        # so no worker-blocking sleep is needed on failure
+        password_ok = config.verify_admin_password(password)
+        if username == admin_user and password_ok:
             user = User(username)
             login_user(user)
             return redirect(url_for('index'))
         else:
-            # Add small delay to prevent timing attacks
-            time.sleep(0.5)
             return render_template('login.html', error='Invalid credentials')
 
     return render_template('login.html')
@@ -318,16 +551,48 @@ def send_command():
         return jsonify({'success': False, 'error': 'No command provided'})
     
     result = execute_bedrock_command(command)
-    
-    # Emit to websocket for live console
-    socketio.emit('console_output', {
-        'timestamp': datetime.now().isoformat(),
+
+    # Broadcast to the live console off the request path so the HTTP
+    # response doesn't wait on SocketIO delivery to every client
+    socketio.start_background_task(_emit_console_output, command, result)
+
+    return jsonify(result)
+
+def _console_payload(command, result):
+    """Build a console_output payload (epoch ms - cheaper than ISO formatting)"""
+    return {
+        'timestamp': time.time_ns() // 1_000_000,
         'command': command,
         'response': result.get('response', result.get('error', '')),
         'success': result['success']
-    })
-    
-    return jsonify(result)
+    }
+
+# Broadcast console events are coalesced: bursts of commands produce one
+# console_output_batch frame per 50ms flush instead of a WebSocket frame
+# apiece. The flusher task runs only while the buffer is non-empty.
+# Direct per-session replies in handle_command stay unbatched for latency.
+_console_buffer = deque(maxlen=256)
+_console_flusher_running = False
+
+def _console_flusher():
+    global _console_flusher_running
+    while True:
+        socketio.sleep(0.05)
+        if not _console_buffer:
+            _console_flusher_running = False
+            return
+        batch = []
+        while _console_buffer and len(batch) < 64:
+            batch.append(_console_buffer.popleft())
+        socketio.emit('console_output_batch', batch)
+
+def _emit_console_output(command, result):
+    """Queue a console_output event for the batched broadcast"""
+    global _console_flusher_running
+    _console_buffer.append(_console_payload(command, result))
+    if not _console_flusher_running:
+        _console_flusher_running = True
+        socketio.start_background_task(_console_flusher)
 
 @app.route('/api/test-console')
 @login_required
@@ -357,33 +622,69 @@ def test_console():
     
     return jsonify(result)
 
+# Pool for overlapping independent SSH round-trips within one request
+_ssh_pool = ThreadPoolExecutor(max_workers=4)
+
+# max-players comes from server.properties, which rarely changes - reuse it
+# for a while instead of re-reading the file over SSH on every status poll
+_max_players_cache = {'value': 20, 'ts': 0}
+_MAX_PLAYERS_TTL = 60  # seconds
+
+# Short-lived is_running cache shared by the status and connection-test
+# polls; each miss costs an SSH/docker round-trip
+_is_running_cache = {'t': 0.0, 'v': False}
+_IS_RUNNING_TTL = 2.0
+_is_running_lock = Lock()
+
+def _cached_is_running():
+    """bedrock_client.is_running() behind a short TTL"""
+    with _is_running_lock:
+        now = time.monotonic()
+        if now - _is_running_cache['t'] < _IS_RUNNING_TTL:
+            return _is_running_cache['v']
+        running = bedrock_client.is_running()
+        _is_running_cache['t'] = time.monotonic()
+        _is_running_cache['v'] = running
+        return running
+
 @app.route('/api/status')
 @login_required
 def server_status():
     """Get server status"""
-    server_config = config.get_server_config()
-    print(f"Checking server status - Container: {server_config.get('container_name', 'unknown')}")
-
-    if not bedrock_client.is_running():
+    now = time.time()
+
+    # Fire the independent SSH probes in parallel so the poll costs one
+    # round-trip instead of three in series
+    f_running = _ssh_pool.submit(_cached_is_running)
+    f_players = _ssh_pool.submit(bedrock_client.get_online_players)
+    f_props = None
+    if now - _max_players_cache['ts'] >= _MAX_PLAYERS_TTL:
+        f_props = _ssh_pool.submit(bedrock_client.get_server_properties)
+
+    if not f_running.result():
+        if f_props:
+            f_props.cancel()
+        f_players.result()
         return jsonify({
             'online': False,
             'error': 'Server container not running'
         })
 
     # Get online players using the log-based method
-    player_result = bedrock_client.get_online_players()
+    player_result = f_players.result()
     current_players = len(player_result.get('players', [])) if player_result['success'] else 0
 
-    # Get max players from server properties
-    props_result = bedrock_client.get_server_properties()
-    max_players = 20  # Default
-    if props_result['success']:
-        max_players = int(props_result['properties'].get('max-players', 20))
+    # Get max players from server properties (cached)
+    if f_props:
+        props_result = f_props.result()
+        if props_result['success']:
+            _max_players_cache['value'] = int(props_result['properties'].get('max-players', 20))
+            _max_players_cache['ts'] = now
 
     return jsonify({
         'online': True,
         'players': current_players,
-        'max_players': max_players
+        'max_players': _max_players_cache['value']
     })
 
 @app.route('/api/players')
@@ -401,45 +702,57 @@ def get_players():
 
     return jsonify({'success': False, 'players': []})
 
+# docker stats --no-stream takes around a second over SSH; absorb
+# overlapping dashboard polls with a short shared cache (the lock also
+# coalesces concurrent misses into a single upstream call)
+_stats_cache = {'t': 0.0, 'v': None}
+_STATS_TTL = 2.0
+_stats_lock = Lock()
+
 @app.route('/api/stats')
 @login_required
 def get_stats():
     """Get server performance statistics"""
-    result = bedrock_client.get_container_stats()
+    with _stats_lock:
+        if time.monotonic() - _stats_cache['t'] < _STATS_TTL:
+            return jsonify(_stats_cache['v'])
+        result = bedrock_client.get_container_stats()
+        if result.get('success'):
+            _stats_cache['v'] = result
+            _stats_cache['t'] = time.monotonic()
     return jsonify(result)
 
+# Version check cache - the current version only changes on a server
+# restart/update and the latest release changes at most daily, so avoid
+# re-running the SSH log scan and the outbound HTTP fetch on every poll
+_version_cache = {'current': None, 'current_ts': 0, 'latest': None, 'latest_ts': 0}
+_VERSION_CURRENT_TTL = 300   # seconds - SSH log scan
+_VERSION_LATEST_TTL = 3600   # seconds - remote HTTP fetch
+
 @app.route('/api/version')
 @login_required
 def get_version():
     """Get server version and check for updates"""
     import urllib.request
     import ssl
-    import subprocess
 
-    current_version = None
-    latest_version = None
+    now = time.time()
+    current_version = _version_cache['current'] if now - _version_cache['current_ts'] < _VERSION_CURRENT_TTL else None
+    latest_version = _version_cache['latest'] if now - _version_cache['latest_ts'] < _VERSION_LATEST_TTL else None
 
-    # Try to get current version from the BEGINNING of server logs (version appears at startup)
-    # Use head instead of tail to get the first 100 lines where version info is
-    try:
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker logs {bedrock_client.container_name} 2>&1 | head -100'
-        result = bedrock_client._ssh_command(docker_cmd)
-        if result and result.returncode == 0:
-            logs = result.stdout
-            # Look for version in startup logs like "Version: 1.21.51.02"
-            version_match = re.search(r'Version[:\s]+(\d+\.\d+\.\d+(?:\.\d+)?)', logs)
-            if version_match:
-                current_version = version_match.group(1)
-            # Also check for "Downloading Bedrock server version X.X.X.X"
-            if not current_version:
-                dl_match = re.search(r'Downloading Bedrock server version (\d+\.\d+\.\d+(?:\.\d+)?)', logs)
-                if dl_match:
-                    current_version = dl_match.group(1)
-    except Exception as e:
-        print(f"Failed to get version from logs: {e}")
+    # Current version comes from the container's startup logs; the client
+    # caches it per container start so this rarely touches SSH
+    if not current_version:
+        try:
+            current_version = bedrock_client.get_startup_version()
+            if current_version:
+                _version_cache['current'] = current_version
+                _version_cache['current_ts'] = now
+        except Exception as e:
+            print(f"Failed to get version from logs: {e}")
 
     # Try to fetch latest version from official Minecraft download page
-    try:
+    if not latest_version:
         ssl_verify = config.get('security.ssl_verify', True)
         if ssl_verify:
             ctx = ssl.create_default_context()
@@ -448,54 +761,59 @@ def get_version():
             ctx.check_hostname = False
             ctx.verify_mode = ssl.CERT_NONE
 
-        # Try the official Bedrock server download page
-        req = urllib.request.Request(
-            'https://www.minecraft.net/en-us/download/server/bedrock',
-            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        )
-        with urllib.request.urlopen(req, timeout=10, context=ctx) as response:
-            html = response.read().decode('utf-8')
-            # Look for version in download links like "bedrock-server-1.21.132.zip"
-            version_match = re.search(r'bedrock-server-(\d+\.\d+\.\d+(?:\.\d+)?)', html)
-            if version_match:
-                latest_version = version_match.group(1)
-    except Exception as e:
-        print(f"Failed to fetch latest version from download page: {e}")
-
-    # Fallback: try Minecraft feedback API
-    if not latest_version:
         try:
+            # Try the official Bedrock server download page
             req = urllib.request.Request(
-                'https://feedback.minecraft.net/api/v2/help_center/en-us/articles.json?per_page=20&sort_by=created_at&sort_order=desc',
-                headers={'User-Agent': 'Mozilla/5.0'}
+                'https://www.minecraft.net/en-us/download/server/bedrock',
+                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
             )
             with urllib.request.urlopen(req, timeout=10, context=ctx) as response:
-                import json
-                data = json.loads(response.read().decode('utf-8'))
-                for article in data.get('articles', []):
-                    title = article.get('title', '')
-                    if 'Bedrock' in title and 'Preview' not in title:
-                        version_match = re.search(r'(\d+\.\d+\.\d+)', title)
-                        if version_match:
-                            latest_version = version_match.group(1)
-                            break
+                html = response.read().decode('utf-8')
+                # Look for version in download links like "bedrock-server-1.21.132.zip"
+                version_match = re.search(r'bedrock-server-(\d+\.\d+\.\d+(?:\.\d+)?)', html)
+                if version_match:
+                    latest_version = version_match.group(1)
         except Exception as e:
-            print(f"Failed to fetch latest version from feedback API: {e}")
+            print(f"Failed to fetch latest version from download page: {e}")
 
-    # Determine if update is available
+        # Fallback: try Minecraft feedback API
+        if not latest_version:
+            try:
+                req = urllib.request.Request(
+                    'https://feedback.minecraft.net/api/v2/help_center/en-us/articles.json?per_page=20&sort_by=created_at&sort_order=desc',
+                    headers={'User-Agent': 'Mozilla/5.0'}
+                )
+                with urllib.request.urlopen(req, timeout=10, context=ctx) as response:
+                    data = json.loads(response.read().decode('utf-8'))
+                    for article in data.get('articles', []):
+                        title = article.get('title', '')
+                        if 'Bedrock' in title and 'Preview' not in title:
+                            version_match = re.search(r'(\d+\.\d+\.\d+)', title)
+                            if version_match:
+                                latest_version = version_match.group(1)
+                                break
+            except Exception as e:
+                print(f"Failed to fetch latest version from feedback API: {e}")
+
+        if latest_version:
+            _version_cache['latest'] = latest_version
+            _version_cache['latest_ts'] = now
+
+    return _version_response(current_version, latest_version)
+
+@lru_cache(maxsize=32)
+def _ver_tuple(version, n=4):
+    """Normalize a dotted version string to a zero-padded tuple"""
+    parts = tuple(int(x) for x in version.split('.'))
+    return parts + (0,) * (n - len(parts))
+
+def _version_response(current_version, latest_version):
+    """Build the /api/version payload, comparing versions numerically"""
     update_available = False
     if current_version and latest_version:
-        # Simple version comparison - split into parts and compare
         try:
-            current_parts = [int(x) for x in current_version.split('.')]
-            latest_parts = [int(x) for x in latest_version.split('.')]
-            # Pad shorter version with zeros
-            while len(current_parts) < len(latest_parts):
-                current_parts.append(0)
-            while len(latest_parts) < len(current_parts):
-                latest_parts.append(0)
-            update_available = latest_parts > current_parts
-        except:
+            update_available = _ver_tuple(latest_version) > _ver_tuple(current_version)
+        except ValueError:
             pass
 
     return jsonify({
@@ -516,15 +834,29 @@ def get_logs():
     result = bedrock_client.get_logs(lines=min(lines, 1000))  # Cap at 1000 lines
 
     if result['success']:
-        log_lines = result['logs'].split('\n')
+        # No filter: echo the blob back without splitting and re-joining
+        # it (two full passes plus a list of per-line strings)
+        if not search and not level:
+            logs = result['logs']
+            return jsonify({
+                'success': True,
+                'logs': logs,
+                'line_count': logs.count('\n') + 1
+            })
 
-        # Filter by search term
-        if search:
-            log_lines = [line for line in log_lines if search.lower() in line.lower()]
+        # splitlines() rather than split('\n'): no trailing empty-string
+        # element, and blank lines can never pass the filters anyway
+        log_lines = result['logs'].splitlines()
 
-        # Filter by log level
-        if level:
-            log_lines = [line for line in log_lines if f'[{level}]' in line]
+        # Apply both filters in a single pass. Case-insensitive search goes
+        # through a precompiled escaped regex so no per-line .lower() copy
+        # is allocated (the lowering happens inside the C matcher)
+        if search or level:
+            pattern = re.compile(re.escape(search), re.IGNORECASE) if search else None
+            level_tag = f'[{level}]' if level else ''
+            log_lines = [line for line in log_lines
+                         if (pattern is None or pattern.search(line))
+                         and (not level_tag or level_tag in line)]
 
         return jsonify({
             'success': True,
@@ -577,24 +909,32 @@ def toggle_scheduled_task(task_id):
     success = task_scheduler.toggle_task(task_id, enabled)
     return jsonify({'success': success})
 
+# Quick actions - registered as individual routes at import time so Flask's
+# URL map dispatches straight to a handler with the command bound by closure
+# (no per-request dict lookup or membership check)
+QUICK_ACTIONS = {
+    'save': 'save-all',
+    'whitelist_on': 'whitelist on',
+    'whitelist_off': 'whitelist off',
+    'weather_clear': 'weather clear',
+    'weather_rain': 'weather rain',
+    'time_day': 'time set day',
+    'time_night': 'time set night'
+}
+
+def _register_quick_actions():
+    for action, command in QUICK_ACTIONS.items():
+        def handler(command=command):
+            return jsonify(execute_bedrock_command(command))
+        handler.__name__ = f'quick_{action}'
+        app.add_url_rule(f'/api/quick/{action}', handler.__name__, login_required(handler))
+
+_register_quick_actions()
+
 @app.route('/api/quick/<action>')
 @login_required
 def quick_action(action):
-    """Quick actions"""
-    commands = {
-        'save': 'save-all',
-        'whitelist_on': 'whitelist on',
-        'whitelist_off': 'whitelist off',
-        'weather_clear': 'weather clear',
-        'weather_rain': 'weather rain',
-        'time_day': 'time set day',
-        'time_night': 'time set night'
-    }
-
-    if action in commands:
-        result = execute_bedrock_command(commands[action])
-        return jsonify(result)
-
+    """Fallback for unknown quick actions (the known ones have static rules)"""
     return jsonify({'success': False, 'error': 'Unknown action'})
 
 @app.route('/api/server-properties')
@@ -618,114 +958,68 @@ def update_server_properties():
 @login_required
 def get_whitelist():
     """Get whitelist"""
-    result = bedrock_client.get_whitelist()
-    return jsonify(result)
-
-@app.route('/api/whitelist/add', methods=['POST'])
-@login_required
-def add_to_whitelist():
-    """Add player to whitelist"""
-    data = request.get_json()
-    player = data.get('player', '').strip()
-
-    if not player:
-        return jsonify({'success': False, 'error': 'No player specified'})
-
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
-
-    result = execute_bedrock_command(f'whitelist add "{player}"')
-    return jsonify(result)
-
-@app.route('/api/whitelist/remove', methods=['POST'])
-@login_required
-def remove_from_whitelist():
-    """Remove player from whitelist"""
-    data = request.get_json()
-    player = data.get('player', '').strip()
-
-    if not player:
-        return jsonify({'success': False, 'error': 'No player specified'})
-
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
-
-    result = execute_bedrock_command(f'whitelist remove "{player}"')
-    return jsonify(result)
+    return jsonify(fetch_whitelist())
 
 @app.route('/api/ops')
 @login_required
 def get_ops():
     """Get operator list"""
-    result = bedrock_client.get_ops()
-    return jsonify(result)
+    return jsonify(fetch_ops())
+
+# Player commands whose whole body is "validate player, run one command,
+# invalidate a cache" - registered from a table like the quick actions.
+# Commands with extra fields to validate (kick, teleport, give, gamemode,
+# effect) keep dedicated handlers below; folding their validation into a
+# generic format_map would silently drop it.
+PLAYER_COMMANDS = {
+    'add_to_whitelist': ('/api/whitelist/add', 'whitelist add "{player}"', 'fetch_whitelist'),
+    'remove_from_whitelist': ('/api/whitelist/remove', 'whitelist remove "{player}"', 'fetch_whitelist'),
+    'op_player': ('/api/player/op', 'op "{player}"', 'fetch_ops'),
+    'deop_player': ('/api/player/deop', 'deop "{player}"', 'fetch_ops'),
+}
+
+def _register_player_commands():
+    caches = {'fetch_whitelist': fetch_whitelist, 'fetch_ops': fetch_ops}
+    for name, (rule, template, cache_name) in PLAYER_COMMANDS.items():
+        def handler(template=template, cache=caches[cache_name]):
+            data = request.get_json()
+            player, error = extract_player(data)
+            if error:
+                return error
+            result = execute_bedrock_command(template.format(player=player))
+            cache.invalidate()
+            return jsonify(result)
+        handler.__name__ = name
+        app.add_url_rule(rule, name, login_required(handler), methods=['POST'])
+
+_register_player_commands()
 
 @app.route('/api/player/kick', methods=['POST'])
 @login_required
 def kick_player():
     """Kick a player"""
     data = request.get_json()
-    player = data.get('player', '').strip()
+    player, error = extract_player(data)
+    if error:
+        return error
     reason = data.get('reason', '').strip()
 
-    if not player:
-        return jsonify({'success': False, 'error': 'No player specified'})
-
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
-
     # Sanitize reason (basic cleanup for safety)
     if reason:
-        reason = re.sub(r'[^\w\s\-]', '', reason)[:100]  # Remove special chars, limit length
+        reason = _REASON_SANITIZE_RE.sub('', reason)[:100]  # Remove special chars, limit length
 
     cmd = f'kick "{player}" {reason}' if reason else f'kick "{player}"'
     result = execute_bedrock_command(cmd)
     return jsonify(result)
 
-@app.route('/api/player/op', methods=['POST'])
-@login_required
-def op_player():
-    """Give operator status"""
-    data = request.get_json()
-    player = data.get('player', '').strip()
-
-    if not player:
-        return jsonify({'success': False, 'error': 'No player specified'})
-
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
-
-    result = execute_bedrock_command(f'op "{player}"')
-    return jsonify(result)
-
-@app.route('/api/player/deop', methods=['POST'])
-@login_required
-def deop_player():
-    """Remove operator status"""
-    data = request.get_json()
-    player = data.get('player', '').strip()
-
-    if not player:
-        return jsonify({'success': False, 'error': 'No player specified'})
-
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
-
-    result = execute_bedrock_command(f'deop "{player}"')
-    return jsonify(result)
-
 @app.route('/api/player/teleport', methods=['POST'])
 @login_required
 def teleport_player():
     """Teleport player to coordinates"""
     data = request.get_json()
-    player = data.get('player', '').strip()
-
-    if not player:
-        return jsonify({'success': False, 'error': 'No player specified'})
-
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
+    player, error = extract_player(data)
+    if error:
+        return error
 
     # Validate coordinates
     try:
@@ -747,17 +1041,16 @@ def teleport_player():
 def give_item():
     """Give item to player"""
     data = request.get_json()
-    player = data.get('player', '').strip()
     item = data.get('item', '').strip()
-
-    if not player or not item:
+    if not item:
         return jsonify({'success': False, 'error': 'Player and item required'})
 
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
+    player, error = extract_player(data)
+    if error:
+        return error
 
-    # Validate item name (alphanumeric and underscore only)
-    if not re.match(r'^[a-z_]+$', item):
+    # Validate item name (lowercase letters and underscore only)
+    if not _ITEM_RE.match(item):
         return jsonify({'success': False, 'error': 'Invalid item name'})
 
     # Validate amount
@@ -776,18 +1069,13 @@ def give_item():
 def change_gamemode():
     """Change player gamemode"""
     data = request.get_json()
-    player = data.get('player', '').strip()
+    player, error = extract_player(data)
+    if error:
+        return error
     gamemode = data.get('gamemode', 'survival').strip().lower()
 
-    if not player:
-        return jsonify({'success': False, 'error': 'No player specified'})
-
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
-
     # Validate gamemode
-    valid_gamemodes = ['survival', 'creative', 'adventure', 'spectator', 's', 'c', 'a', 'sp', '0', '1', '2', '3']
-    if gamemode not in valid_gamemodes:
+    if gamemode not in VALID_GAMEMODES:
         return jsonify({'success': False, 'error': 'Invalid gamemode'})
 
     result = execute_bedrock_command(f'gamemode {gamemode} "{player}"')
@@ -798,14 +1086,13 @@ def change_gamemode():
 def give_effect():
     """Give effect to player"""
     data = request.get_json()
-    player = data.get('player', '').strip()
     effect = data.get('effect', '').strip().lower()
-
-    if not player or not effect:
+    if not effect:
         return jsonify({'success': False, 'error': 'Player and effect required'})
 
-    if not validate_minecraft_name(player):
-        return jsonify({'success': False, 'error': 'Invalid player name (must be 3-16 alphanumeric characters)'})
+    player, error = extract_player(data)
+    if error:
+        return error
 
     # Validate effect
     if effect not in VALID_EFFECTS:
@@ -864,8 +1151,7 @@ def set_gamerule():
 @login_required
 def list_backups():
     """List all backups"""
-    result = bedrock_client.list_backups()
-    return jsonify(result)
+    return jsonify(fetch_backups())
 
 @app.route('/api/backup/create', methods=['POST'])
 @login_required
@@ -875,6 +1161,7 @@ def create_backup():
     backup_name = data.get('name')
 
     result = bedrock_client.create_backup(backup_name)
+    fetch_backups.invalidate()
     return jsonify(result)
 
 @app.route('/api/backup/restore', methods=['POST'])
@@ -901,6 +1188,7 @@ def delete_backup():
         return jsonify({'success': False, 'error': 'No filename specified'})
 
     result = bedrock_client.delete_backup(filename)
+    fetch_backups.invalidate()
     return jsonify(result)
 
 @app.route('/api/world/new', methods=['POST'])
@@ -918,8 +1206,10 @@ def create_new_world():
 def restart_server():
     """Restart the Minecraft server"""
     try:
-        # First save the world
-        execute_bedrock_command('save-all')
+        # Kick off the world save and overlap it with restart signalling -
+        # the server flushes asynchronously and its SIGTERM handler saves
+        # again on the way down, so there's no need to block on the round-trip
+        _ssh_pool.submit(execute_bedrock_command, 'save-all')
 
         # Restart the container
         result = bedrock_client.restart_container()
@@ -932,8 +1222,9 @@ def restart_server():
 def stop_server():
     """Stop the Minecraft server"""
     try:
-        # First save the world
-        execute_bedrock_command('save-all')
+        # Overlap the world save with container stop signalling (the
+        # server's SIGTERM handler performs its own save as well)
+        _ssh_pool.submit(execute_bedrock_command, 'save-all')
 
         # Stop the container
         result = bedrock_client.stop_container()
@@ -980,19 +1271,24 @@ def get_server_version():
 def update_connection_settings():
     """Update server connection settings"""
     try:
+        form = request.form
         server_config = {
-            'connection_type': request.form.get('connection_type'),
-            'ssh_host': request.form.get('ssh_host', ''),
-            'ssh_user': request.form.get('ssh_user', ''),
-            'container_name': request.form.get('container_name'),
-            'server_host': request.form.get('server_host')
+            'connection_type': form.get('connection_type'),
+            'ssh_host': form.get('ssh_host', ''),
+            'ssh_user': form.get('ssh_user', ''),
+            'container_name': form.get('container_name'),
+            'server_host': form.get('server_host')
         }
 
         # Validate and save (validation happens in config.update_server_config)
         success, error = config.update_server_config(server_config)
         if success:
-            # Reinitialize bedrock client with new config
+            # Reinitialize bedrock client with new config and drop caches
+            # that belong to the previous server
             initialize_bedrock_client()
+            fetch_whitelist.invalidate()
+            fetch_ops.invalidate()
+            fetch_backups.invalidate()
             return jsonify({'success': True, 'message': 'Connection settings updated successfully'})
         else:
             return jsonify({'success': False, 'message': error or 'Failed to save configuration'}), 400
@@ -1004,9 +1300,10 @@ def update_connection_settings():
 def update_admin_credentials():
     """Update admin credentials"""
     try:
-        current_password = request.form.get('current_password')
-        new_password = request.form.get('new_password')
-        admin_user = request.form.get('admin_user')
+        form = request.form
+        current_password = form.get('current_password')
+        new_password = form.get('new_password')
+        admin_user = form.get('admin_user')
 
         # Verify current password using secure verification
         if not config.verify_admin_password(current_password):
@@ -1021,6 +1318,7 @@ def update_admin_credentials():
             admin_config['password'] = new_password
 
         if config.update_admin_config(admin_config):
+            refresh_config_cache()
             return jsonify({'success': True, 'message': 'Admin credentials updated successfully'})
         else:
             return jsonify({'success': False, 'message': 'Failed to save configuration'}), 500
@@ -1032,18 +1330,15 @@ def update_admin_credentials():
 def update_map_settings():
     """Update map server settings"""
     try:
+        form = request.form
         map_config = {
-            'enabled': 'map_enabled' in request.form,
-            'type': request.form.get('map_type', 'unmined'),
-            'url': request.form.get('map_url', '')
+            'enabled': 'map_enabled' in form,
+            'type': form.get('map_type', 'unmined'),
+            'url': form.get('map_url', '')
         }
 
-        # Update config
-        current_config = config.config
-        current_config['map'] = map_config
-        config.config = current_config
-
-        if config.save():
+        if config.update_map_config(map_config):
+            refresh_config_cache()
             flash('Map settings updated successfully', 'success')
         else:
             flash('Failed to save map configuration', 'error')
@@ -1058,32 +1353,46 @@ def update_map_settings():
 def test_connection_api():
     """Test the current server connection"""
     try:
-        if bedrock_client.is_running():
+        if _cached_is_running():
             return jsonify({'success': True, 'message': 'Successfully connected to Minecraft server!'})
         else:
             return jsonify({'success': False, 'message': 'Container is not running or not accessible'})
     except Exception as e:
         return jsonify({'success': False, 'message': f'Connection failed: {str(e)}'})
 
+# Constant error payloads for the common validation failures (jsonify
+# still builds the Response per request - reusing a Response instance is
+# unsafe because after_request hooks mutate headers in place)
+_ERR_NO_ITEMS = {'success': False, 'error': 'No items specified'}
+_ERR_NO_VALID_ITEMS = {'success': False, 'error': 'No valid items found'}
+_KIT_DISABLED = {'enabled': False}
+
 @app.route('/api/welcome-kit/setup', methods=['POST'])
 @login_required
 def setup_welcome_kit():
     """Set up automated welcome kit for new players"""
-    data = request.get_json()
+    # cache=False: the body is only read once, so skip werkzeug's cached copy
+    data = request.get_json(silent=True, cache=False) or {}
     items_text = data.get('items', '').strip()
 
     if not items_text:
-        return jsonify({'success': False, 'error': 'No items specified'})
+        return jsonify(_ERR_NO_ITEMS)
 
     # Parse items (one per line, format: "item_name [amount] [zoom_level_for_maps]")
-    print(f"[Welcome Kit] Received items_text: {items_text}", flush=True)
+    # - a single precompiled regex tokenizes and shape-checks each line
     items = []
     for line in items_text.split('\n'):
         line = line.strip()
         if not line:
             continue
-        parts = line.split()
-        item_name = parts[0]
+
+        match = _KIT_LINE_RE.match(line)
+        if not match:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid welcome kit line: {line}'
+            })
+        item_name, amount, zoom_level = match.groups()
 
         # Validate item name
         if item_name not in COMMON_WELCOME_ITEMS:
@@ -1092,77 +1401,60 @@ def setup_welcome_kit():
                 'error': f'Invalid item: {item_name}. Only common welcome items are allowed.'
             })
 
-        # Validate amount
-        amount = parts[1] if len(parts) > 1 else '1'
-        try:
-            amount_int = int(amount)
-            if amount_int < 1 or amount_int > 64:
-                return jsonify({
-                    'success': False,
-                    'error': f'Invalid amount for {item_name}: must be 1-64'
-                })
-        except ValueError:
+        # Validate amount and zoom with single chained comparisons (the
+        # regex guarantees digits, so int() can't fail; a bit-mask range
+        # test buys nothing under CPython's bytecode dispatch)
+        amount = amount or '1'
+        if not 1 <= int(amount) <= 64:
             return jsonify({
                 'success': False,
-                'error': f'Invalid amount for {item_name}: must be a number'
+                'error': f'Invalid amount for {item_name}: must be 1-64'
             })
 
         # Validate zoom level if present (for maps)
-        zoom_level = parts[2] if len(parts) > 2 else None
-        if zoom_level is not None:
-            try:
-                zoom_int = int(zoom_level)
-                if zoom_int < 0 or zoom_int > 4:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Map zoom level must be 0-4'
-                    })
-            except ValueError:
-                return jsonify({
-                    'success': False,
-                    'error': 'Map zoom level must be a number'
-                })
+        if zoom_level is not None and not 0 <= int(zoom_level) <= 4:
+            return jsonify({
+                'success': False,
+                'error': 'Map zoom level must be 0-4'
+            })
 
         items.append((item_name, amount, zoom_level))
-        print(f"[Welcome Kit] Parsed item: {item_name}, amount: {amount}, zoom: {zoom_level}", flush=True)
 
     if not items:
-        return jsonify({'success': False, 'error': 'No valid items found'})
-
-    # Create commands for the welcome kit
-    # This uses Bedrock commands to give items to players who don't have a "welcomed" tag
-    commands = []
-    for item_name, amount, zoom_level in items:
-        if zoom_level is not None:
-            # For maps with zoom level: give @a[tag=!welcomed] filled_map 1 2
-            cmd = f'give @a[tag=!welcomed] {item_name} {amount} {zoom_level}'
-            commands.append(cmd)
-            print(f"[Welcome Kit] Command with zoom: {cmd}", flush=True)
-        else:
-            cmd = f'give @a[tag=!welcomed] {item_name} {amount}'
-            commands.append(cmd)
-            print(f"[Welcome Kit] Command: {cmd}", flush=True)
-
-    # Add tag to mark players as welcomed
-    commands.append('tag @a[tag=!welcomed] add welcomed')
-
-    # Combine into single command for scheduler
-    full_command = ' && '.join(commands)
+        return jsonify(_ERR_NO_VALID_ITEMS)
+
+    # Create commands for the welcome kit in a single join - one give per
+    # item (maps carry their zoom level), then tag players as welcomed.
+    # This uses Bedrock commands targeting players without a "welcomed" tag.
+    full_command = ' && '.join(
+        f'give @a[tag=!welcomed] {item_name} {amount} {zoom_level}'
+        if zoom_level is not None
+        else f'give @a[tag=!welcomed] {item_name} {amount}'
+        for item_name, amount, zoom_level in items
+    ) + ' && tag @a[tag=!welcomed] add welcomed'
 
     # Check if welcome kit task already exists and remove it
-    existing_tasks = task_scheduler.get_tasks()
-    for task_id, task in list(existing_tasks.items()):
-        if task['name'] == 'Welcome Kit':
-            task_scheduler.remove_task(task_id)
-
-    # Create scheduled task (runs every 30 seconds to check for new players)
+    existing_id, _ = task_scheduler.get_task_by_name('Welcome Kit')
+    if existing_id:
+        task_scheduler.remove_task(existing_id)
+
+    # Persist as an event task (fired by the player-join watcher rather
+    # than a polling interval). The parsed item summary rides along as
+    # metadata so the status endpoint doesn't have to re-tokenize the
+    # command string.
     task_id = task_scheduler.add_task(
         'Welcome Kit',
         full_command,
-        'interval',
-        interval_minutes=0.5  # Every 30 seconds
+        'event',
+        metadata={
+            'items': [f"{item_name} x{amount}" for item_name, amount, _ in items],
+            'map_zoom': next((zoom for item_name, _, zoom in items
+                              if zoom is not None and item_name in MAP_ITEMS), None)
+        }
     )
 
+    start_kit_watcher()
+
     return jsonify({
         'success': True,
         'message': f'Welcome kit enabled with {len(items)} items',
@@ -1173,11 +1465,10 @@ def setup_welcome_kit():
 @login_required
 def disable_welcome_kit():
     """Disable the welcome kit scheduled task"""
-    existing_tasks = task_scheduler.get_tasks()
-    for task_id, task in list(existing_tasks.items()):
-        if task['name'] == 'Welcome Kit':
-            if task_scheduler.remove_task(task_id):
-                return jsonify({'success': True, 'message': 'Welcome kit disabled'})
+    task_id, _ = task_scheduler.get_task_by_name('Welcome Kit')
+    if task_id and task_scheduler.remove_task(task_id):
+        stop_kit_watcher()
+        return jsonify({'success': True, 'message': 'Welcome kit disabled'})
 
     return jsonify({'success': False, 'error': 'Welcome kit task not found'})
 
@@ -1185,36 +1476,39 @@ def disable_welcome_kit():
 @login_required
 def welcome_kit_status():
     """Check if welcome kit is enabled"""
-    existing_tasks = task_scheduler.get_tasks()
-    for task_id, task in existing_tasks.items():
-        if task['name'] == 'Welcome Kit':
-            # Extract items from the command
-            command = task['command']
-            # Commands are like: give @a[tag=!welcomed] map 1 && give @a[tag=!welcomed] compass 1 && ...
-            # OR with zoom level: give @a[tag=!welcomed] filled_map 1 2
-            items = []
-            map_zoom = None
-            for cmd in command.split(' && '):
-                if cmd.startswith('give @a[tag=!welcomed]'):
-                    parts = cmd.split()
-                    if len(parts) >= 3:
-                        item_name = parts[2]
-                        amount = parts[3] if len(parts) > 3 else '1'
-                        # Check if this is a map with zoom level
-                        if item_name in ['filled_map', 'map'] and len(parts) >= 5:
-                            map_zoom = parts[4]
-                            items.append(f"{item_name} x{amount}")
-                        else:
-                            items.append(f"{item_name} x{amount}")
+    task_id, task = task_scheduler.get_task_by_name('Welcome Kit')
+    if task is None:
+        # Common case for the poll: one index lookup, constant payload
+        return jsonify(_KIT_DISABLED)
+
+    # Tasks created since metadata support carry the parsed summary
+    metadata = task.get('metadata')
+    if metadata is not None:
+        return jsonify({
+            'enabled': True,
+            'task_id': task_id,
+            'items': metadata.get('items', []),
+            'map_zoom': metadata.get('map_zoom')
+        })
 
-            return jsonify({
-                'enabled': True,
-                'task_id': task_id,
-                'items': items,
-                'map_zoom': map_zoom
-            })
+    # Legacy tasks: extract items from the command string with one
+    # compiled scan instead of per-command split/startswith/split
+    # Commands are like: give @a[tag=!welcomed] map 1 && give @a[tag=!welcomed] compass 1 && ...
+    # OR with zoom level: give @a[tag=!welcomed] filled_map 1 2
+    items = []
+    map_zoom = None
+    for match in _GIVE_RE.finditer(task['command']):
+        item_name, amount, zoom = match.groups()
+        items.append(f"{item_name} x{amount or '1'}")
+        if zoom and item_name in MAP_ITEMS:
+            map_zoom = zoom
 
-    return jsonify({'enabled': False})
+    return jsonify({
+        'enabled': True,
+        'task_id': task_id,
+        'items': items,
+        'map_zoom': map_zoom
+    })
 
 @socketio.on('connect')
 @login_required
@@ -1226,13 +1520,16 @@ def handle_connect():
 def handle_command(data):
     command = data.get('command', '')
     if command:
-        result = execute_bedrock_command(command)
-        emit('console_output', {
-            'timestamp': datetime.now().isoformat(),
-            'command': command,
-            'response': result.get('response', result.get('error', '')),
-            'success': result['success']
-        })
+        # Run the SSH-bound command on the worker pool so the socket
+        # worker keeps serving other events while RCON blocks; the done
+        # callback emits back to just the sender's session
+        sid = request.sid
+        future = _ssh_pool.submit(execute_bedrock_command, command)
+        future.add_done_callback(
+            lambda f: socketio.emit('console_output', _console_payload(command, f.result()), to=sid)
+        )
 
 if __name__ == '__main__':
-    socketio.run(app, debug=False, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    # Dev entry point; production runs under gunicorn (see Dockerfile).
+    # With eventlet installed socketio.run uses its server, not Werkzeug.
+    socketio.run(app, debug=False, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -1,11 +1,41 @@
 import subprocess
 import os
 import shlex
+import shutil
 import re
+import threading
+import time
+from datetime import datetime
+
+# Optional fast JSON parsing for container file reads (allowlist,
+# permissions); orjson.JSONDecodeError subclasses ValueError so callers
+# catch that
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 # QNAP-specific Docker path (can be overridden via environment variable)
 DOCKER_PATH = os.getenv('DOCKER_PATH', '/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker')
 
+# Version strings as they appear in the container's startup logs
+VERSION_RE = re.compile(r'Version[:\s]+(\d+\.\d+\.\d+(?:\.\d+)?)')
+DOWNLOAD_VERSION_RE = re.compile(r'Downloading Bedrock server version (\d+\.\d+\.\d+(?:\.\d+)?)')
+
+# Join lines look like "[INFO] Player connected: Steve, xuid: 2535..."
+PLAYER_JOIN_RE = re.compile(r'Player connected:\s+([^,\r\n]+)')
+
+# Everything after the log level marker on a server log line
+_INFO_TAIL_RE = re.compile(r'INFO\]\s*(.*)')
+
+# Backup archives as produced by create_backup
+_BACKUP_NAME_RE = re.compile(r'^[\w\-.]+\.tar\.gz$')
+
+# Markers delimiting the phases of the batched update script
+_UPD_OLD_RE = re.compile(r'::OLD::\n?(.*?)\s*::ENDOLD::', re.S)
+_UPD_RC_STOP_RE = re.compile(r'::RC_STOP::(\d+)')
+_UPD_RC_START_RE = re.compile(r'::RC_START::(\d+)')
+
 
 def _validate_safe_identifier(value: str, field_name: str, max_length: int = 128) -> str:
     """
@@ -54,6 +84,126 @@ def _validate_ssh_user(user: str) -> str:
     return user
 
 
+class _SSHShell:
+    """Long-lived `sh` on the remote host, fed over a single SSH session.
+
+    Spawning a fresh ssh process per command pays fork/exec plus connection
+    setup every call. Instead, commands are written to one remote shell's
+    stdin and their stdout/stderr/exit status recovered via sentinel
+    markers, so back-to-back admin actions cost one pipe write each.
+    """
+
+    _OUT_END = '__PICKAXE_OUT_END__'
+    _ERR_END = '__PICKAXE_ERR_END__'
+
+    def __init__(self, ssh_user, ssh_host, ssh_key):
+        self.ssh_user = ssh_user
+        self.ssh_host = ssh_host
+        self.ssh_key = ssh_key
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def _spawn(self):
+        ssh_cmd = [
+            'ssh',
+            '-i', self.ssh_key,
+            '-o', 'StrictHostKeyChecking=no',
+            '-o', 'UserKnownHostsFile=/dev/null',
+            '-o', 'LogLevel=ERROR',
+            '-o', 'ControlMaster=auto',
+            '-o', 'ControlPath=/tmp/ssh-pickaxe-%r@%h:%p',
+            '-o', 'ControlPersist=300',
+            f'{self.ssh_user}@{self.ssh_host}',
+            'sh'
+        ]
+        self._proc = subprocess.Popen(
+            ssh_cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
+        )
+
+    def close(self):
+        """Tear down the remote shell (it respawns lazily on next use)"""
+        with self._lock:
+            if self._proc is not None:
+                try:
+                    self._proc.kill()
+                except Exception:
+                    pass
+                self._proc = None
+
+    def _read_response(self, result):
+        """Reader loop: collect stdout, then stderr, then the exit code"""
+        out_lines = []
+        err_lines = []
+        target = out_lines
+        for line in self._proc.stdout:
+            if self._OUT_END in line:
+                # Command output may not end with a newline, in which case
+                # the sentinel echo lands on the same line
+                head = line.split(self._OUT_END, 1)[0]
+                if head:
+                    target.append(head)
+                target = err_lines
+            elif self._ERR_END in line:
+                head, tail = line.split(self._ERR_END, 1)
+                if head:
+                    target.append(head)
+                result['returncode'] = int(tail.strip() or 1)
+                result['stdout'] = ''.join(out_lines)
+                result['stderr'] = ''.join(err_lines)
+                return
+            else:
+                target.append(line)
+
+    def run(self, command, timeout=30):
+        """Run a command through the shared shell.
+
+        Returns a CompletedProcess-shaped result, None on timeout (matching
+        the one-shot ssh behavior), or False if the shell itself is
+        unavailable so the caller can fall back to a one-shot invocation.
+        """
+        with self._lock:
+            try:
+                if self._proc is None or self._proc.poll() is not None:
+                    self._spawn()
+                # stdin comes from /dev/null so interactive-ish commands
+                # (docker exec -i) can't swallow the next queued command;
+                # stderr goes through a temp file so both streams survive
+                wrapped = (
+                    '{ ' + command + '\n} </dev/null 2>/tmp/.pickaxe_stderr_$$; rc=$?; '
+                    f'echo {self._OUT_END}; cat /tmp/.pickaxe_stderr_$$; '
+                    f'rm -f /tmp/.pickaxe_stderr_$$; echo {self._ERR_END}$rc\n'
+                )
+                self._proc.stdin.write(wrapped)
+                self._proc.stdin.flush()
+            except Exception as e:
+                print(f"SSH shell write failed: {e}")
+                self._proc = None
+                return False
+
+            result = {}
+            reader = threading.Thread(target=self._read_response, args=(result,), daemon=True)
+            reader.start()
+            reader.join(timeout)
+            if reader.is_alive() or 'returncode' not in result:
+                # Shell is wedged or died mid-response - kill it so the next
+                # call starts clean
+                print(f"SSH shell command timed out after {timeout}s: {command[:50]}...")
+                try:
+                    self._proc.kill()
+                except Exception:
+                    pass
+                self._proc = None
+                return None
+
+            return subprocess.CompletedProcess(
+                command, result['returncode'], result['stdout'], result['stderr'])
+
+
 class BedrockRemoteClient:
     """Client for interacting with Minecraft Bedrock server on remote host via SSH"""
 
@@ -74,8 +224,76 @@ class BedrockRemoteClient:
             print(f"[SECURITY] Invalid configuration rejected: {e}")
             raise ValueError(f"Security validation failed: {e}")
 
-    def _ssh_command(self, command, timeout=30):
-        """Execute command on remote host via SSH"""
+        # Version parsed from startup logs; only changes when the container
+        # restarts, so cache it and invalidate on restart/start/update
+        self._startup_version = None
+
+        # Parsed server.properties (plus the raw file text, which
+        # update_server_properties rewrites) keyed on the remote file's
+        # mtime, so dashboard polls skip the transfer+parse when unchanged
+        self._props_cache = {'mtime': None, 'properties': None, 'raw': None}
+
+        # Shared remote shell - amortizes ssh process spawn across commands
+        self._shell = _SSHShell(self.ssh_user, self.ssh_host,
+                                os.path.expanduser('~/.ssh/minecraft_panel_rsa'))
+
+        # Previous /proc tick sample for delta-based CPU percentage
+        self._stats_sample = None
+
+        # Host path of the container's /data mount, resolved on first use
+        # (immutable for the container's lifetime)
+        self._data_mount = None
+
+        # Last get_server_version result with its monotonic timestamp
+        self._version_cache = (None, 0.0)
+
+    def close(self):
+        """Shut down the shared shell and the multiplexed SSH master"""
+        self._shell.close()
+        try:
+            subprocess.run(
+                ['ssh', '-O', 'exit',
+                 '-o', 'ControlPath=/tmp/ssh-pickaxe-%r@%h:%p',
+                 f'{self.ssh_user}@{self.ssh_host}'],
+                capture_output=True,
+                timeout=5
+            )
+        except Exception:
+            pass
+
+    # Keep at most this much command output; a pathological container log
+    # shouldn't be able to balloon the panel's memory
+    MAX_OUTPUT_BYTES = 2_000_000
+
+    # How long a get_server_version result stays fresh (seconds); the
+    # cache is also dropped whenever the container (re)starts
+    _VERSION_TTL = 300
+
+    @classmethod
+    def _cap_output(cls, result):
+        """Trim oversized stdout to the newest bytes, flagging the cut"""
+        if result and result.stdout and len(result.stdout) > cls.MAX_OUTPUT_BYTES:
+            result.stdout = result.stdout[-cls.MAX_OUTPUT_BYTES:]
+            result.truncated = True
+        return result
+
+    def _ssh_command(self, command, timeout=30, stdin_data=None):
+        """Execute command on remote host via SSH.
+
+        stdin_data, when given, is piped to the remote command's stdin;
+        such commands always use a one-shot ssh process because the shared
+        shell feeds its commands /dev/null (streaming arbitrary bytes
+        through its sentinel framing would corrupt the protocol).
+        """
+        # Prefer the shared long-lived shell; only fall back to a one-shot
+        # ssh process when the shell can't be spawned at all (a timeout is
+        # returned as None rather than retried, since the command may have
+        # already run remotely)
+        if stdin_data is None:
+            result = self._shell.run(command, timeout=timeout)
+            if result is not False:
+                return self._cap_output(result)
+
         ssh_key = os.path.expanduser('~/.ssh/minecraft_panel_rsa')
         ssh_cmd = [
             'ssh',
@@ -83,6 +301,12 @@ class BedrockRemoteClient:
             '-o', 'StrictHostKeyChecking=no',
             '-o', 'UserKnownHostsFile=/dev/null',
             '-o', 'LogLevel=ERROR',
+            # Multiplex over a shared master connection so repeated calls
+            # skip the TCP + key-exchange handshake (first call opens the
+            # master, later ones attach to its control socket)
+            '-o', 'ControlMaster=auto',
+            '-o', 'ControlPath=/tmp/ssh-pickaxe-%r@%h:%p',
+            '-o', 'ControlPersist=300',
             f'{self.ssh_user}@{self.ssh_host}',
             command
         ]
@@ -91,9 +315,10 @@ class BedrockRemoteClient:
                 ssh_cmd,
                 capture_output=True,
                 text=True,
-                timeout=timeout
+                timeout=timeout,
+                input=stdin_data
             )
-            return result
+            return self._cap_output(result)
         except subprocess.TimeoutExpired:
             print(f"SSH command timed out after {timeout}s: {command[:50]}...")
             return None
@@ -101,13 +326,45 @@ class BedrockRemoteClient:
             print(f"SSH command failed: {e}")
             return None
     
+    def open_log_stream(self):
+        """Follow container logs live over a dedicated SSH session.
+
+        Returns a Popen whose stdout yields log lines as they appear, or
+        None if the process can't be started. The caller owns the process
+        and must kill() it when done - this intentionally bypasses the
+        shared shell, which frames one command at a time.
+        """
+        ssh_cmd = [
+            'ssh',
+            '-i', os.path.expanduser('~/.ssh/minecraft_panel_rsa'),
+            '-o', 'StrictHostKeyChecking=no',
+            '-o', 'UserKnownHostsFile=/dev/null',
+            '-o', 'LogLevel=ERROR',
+            '-o', 'ControlMaster=auto',
+            '-o', 'ControlPath=/tmp/ssh-pickaxe-%r@%h:%p',
+            '-o', 'ControlPersist=300',
+            f'{self.ssh_user}@{self.ssh_host}',
+            f'{DOCKER_PATH} logs -f --tail 0 {self.container_name} 2>&1'
+        ]
+        try:
+            return subprocess.Popen(
+                ssh_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+        except Exception as e:
+            print(f"Failed to open log stream: {e}")
+            return None
+
     def send_command(self, command):
         """Send a command to the Minecraft server console"""
-        # QNAP has docker in /share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker
+        # DOCKER_PATH defaults to the QNAP Container Station binary and is
+        # env-overridable for other hosts
         # Bedrock server uses 'send-command' instead of 'mc-send-to-console'
         # Use shlex.quote to prevent command injection
         safe_command = shlex.quote(command)
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} send-command {safe_command}'
+        docker_cmd = f'{DOCKER_PATH} exec -i {self.container_name} send-command {safe_command}'
         result = self._ssh_command(docker_cmd)
 
         if result and result.returncode == 0:
@@ -122,209 +379,282 @@ class BedrockRemoteClient:
                 'response': f'Error: {error_msg}'
             }
 
-    def send_command_with_output(self, command):
-        """Send command and retrieve output from logs"""
-        import time
+    def send_commands(self, commands):
+        """Send several console commands in one SSH/docker round-trip"""
+        if not commands:
+            return {'success': True, 'response': ''}
+        if len(commands) == 1:
+            return self.send_command(commands[0])
+
+        # One docker exec running all send-command invocations back to back
+        # instead of one SSH round-trip per command
+        batch = '; '.join(f'send-command {shlex.quote(cmd)}' for cmd in commands)
+        docker_cmd = f'{DOCKER_PATH} exec -i {self.container_name} sh -c {shlex.quote(batch)}'
+        result = self._ssh_command(docker_cmd)
 
-        # Special handling for common commands that have specific output
-        cmd_lower = command.lower().strip()
+        if result and result.returncode == 0:
+            return {
+                'success': True,
+                'response': result.stdout.strip()
+            }
+        else:
+            error_msg = result.stderr if result else "SSH connection failed"
+            return {
+                'success': False,
+                'response': f'Error: {error_msg}'
+            }
 
-        # For 'list' command, use the dedicated method
-        if cmd_lower == 'list':
-            player_result = self.get_online_players()
-            if player_result['success']:
-                players = player_result['players']
-                if players:
-                    return {
-                        'success': True,
-                        'response': f"There are {len(players)}/20 players online:\n" + '\n'.join(players)
-                    }
-                else:
-                    return {
-                        'success': True,
-                        'response': 'There are 0/20 players online'
-                    }
-
-        # For 'seed' command, get from server properties and try logs
-        if cmd_lower == 'seed':
-            # First send the command to the server
-            self.send_command(command)
-            time.sleep(0.7)
-
-            # Try to get from logs
-            docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker logs --tail 30 {self.container_name} 2>&1'
+    def _poll_log_line(self, needle, delays=(0.05, 0.1, 0.2, 0.4)):
+        """Return the newest just-emitted log line containing needle.
+
+        Polls with exponential backoff and returns as soon as the line
+        appears - fast commands answer in ~50 ms instead of waiting out a
+        fixed sleep, with the same ~0.75 s worst case. A relative --since
+        window (immune to clock skew between panel and NAS) bounds each
+        fetch to lines our command just produced, with --tail capping
+        busy servers.
+        """
+        docker_cmd = f'{DOCKER_PATH} logs --since 10s --tail 20 {self.container_name} 2>&1'
+        for delay in delays:
+            time.sleep(delay)
             result = self._ssh_command(docker_cmd)
 
             if result and result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in reversed(lines):
-                    if 'Seed' in line:
-                        if 'INFO]' in line:
-                            parts = line.split('INFO]', 1)
-                            if len(parts) > 1:
-                                return {
-                                    'success': True,
-                                    'response': parts[1].strip()
-                                }
-
-            # Fallback: get seed from server.properties
-            props_result = self.get_server_properties()
-            if props_result['success']:
-                seed = props_result['properties'].get('level-seed', 'Not set')
-                return {
-                    'success': True,
-                    'response': f"Seed from server.properties: {seed}"
-                }
+                for line in reversed(result.stdout.split('\n')):
+                    if needle in line:
+                        return line
+        return None
+
+    def _handle_list(self, command):
+        player_result = self.get_online_players()
+        if not player_result['success']:
+            return None
+        players = player_result['players']
+        if players:
+            return {
+                'success': True,
+                'response': f"There are {len(players)}/20 players online:\n" + '\n'.join(players)
+            }
+        return {
+            'success': True,
+            'response': 'There are 0/20 players online'
+        }
 
-        # For other commands, just send and confirm
+    def _handle_seed(self, command):
         self.send_command(command)
 
-        # Wait longer for output to appear
-        time.sleep(0.7)
-
-        # Get recent logs to try to capture any relevant output
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker logs --tail 30 {self.container_name} 2>&1'
-        result = self._ssh_command(docker_cmd)
+        line = self._poll_log_line('Seed')
+        if line:
+            # Extract just the seed info, or the whole line if there's no
+            # INFO marker
+            match = _INFO_TAIL_RE.search(line)
+            return {
+                'success': True,
+                'response': match.group(1).strip() if match else line.strip()
+            }
 
-        if result and result.returncode == 0:
-            logs = result.stdout
-            lines = logs.split('\n')
-
-            # Look for seed output specifically
-            if 'seed' in cmd_lower:
-                # First try to find any line with "Seed" (capital S)
-                for line in reversed(lines):
-                    if 'Seed' in line:
-                        # Try to extract just the seed info
-                        if 'INFO]' in line:
-                            parts = line.split('INFO]', 1)
-                            if len(parts) > 1:
-                                return {
-                                    'success': True,
-                                    'response': parts[1].strip()
-                                }
-                        else:
-                            # If no INFO marker, just return the line
-                            return {
-                                'success': True,
-                                'response': line.strip()
-                            }
-
-            # For time queries
-            if 'time query' in cmd_lower:
-                for line in reversed(lines):
-                    if 'time is' in line.lower() and 'INFO]' in line:
-                        parts = line.split('INFO]', 1)
-                        if len(parts) > 1:
-                            return {
-                                'success': True,
-                                'response': parts[1].strip()
-                            }
-
-            # For other commands, return a simple confirmation
+        # Fallback: get seed from server.properties
+        props_result = self.get_server_properties()
+        if props_result['success']:
+            seed = props_result['properties'].get('level-seed', 'Not set')
             return {
                 'success': True,
-                'response': f'✓ Command "{command}" executed'
+                'response': f"Seed from server.properties: {seed}"
             }
-        else:
+        return None
+
+    def _handle_time_query(self, command):
+        self.send_command(command)
+
+        line = self._poll_log_line('time is')
+        if line:
+            match = _INFO_TAIL_RE.search(line)
+            if match:
+                return {
+                    'success': True,
+                    'response': match.group(1).strip()
+                }
+        return {
+            'success': True,
+            'response': f'✓ Command "{command}" executed'
+        }
+
+    # Commands whose log output gets parsed and echoed back; everything
+    # else takes the send-and-confirm path
+    _COMMAND_HANDLERS = {
+        'list': _handle_list,
+        'seed': _handle_seed,
+    }
+
+    def send_command_with_output(self, command):
+        """Send command and retrieve output from logs"""
+        cmd_lower = command.lower().strip()
+
+        handler = self._COMMAND_HANDLERS.get(cmd_lower)
+        if handler is None and cmd_lower.startswith('time query'):
+            # Prefix match: covers daytime/gametime/day, whose replies all
+            # carry the 'time is' needle
+            handler = BedrockRemoteClient._handle_time_query
+        if handler:
+            result = handler(self, command)
+            if result is not None:
+                return result
+
+        # For other commands, just send and confirm - their output
+        # (give, tp, say, ...) logs nothing useful, so return as soon as
+        # the send completes
+        send_result = self.send_command(command)
+        if send_result['success']:
             return {
-                'success': False,
-                'response': 'Command sent but could not verify execution'
+                'success': True,
+                'response': f'✓ Command "{command}" executed'
             }
+        return send_result
     
     def get_logs(self, lines=50):
         """Get recent server logs"""
         # Use 2>&1 to capture stderr (where startup/version info goes) along with stdout
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker logs --tail {lines} {self.container_name} 2>&1'
+        docker_cmd = f'{DOCKER_PATH} logs --tail {lines} {self.container_name} 2>&1'
         result = self._ssh_command(docker_cmd)
 
         if result and result.returncode == 0:
-            return {'success': True, 'logs': result.stdout}
+            return {
+                'success': True,
+                'logs': result.stdout,
+                'truncated': getattr(result, 'truncated', False)
+            }
         else:
             return {'success': False, 'logs': 'Failed to retrieve logs'}
 
+    @staticmethod
+    def _format_bytes(n):
+        """Render a byte count the way docker stats does (B/KiB/MiB/...)"""
+        n = float(n)
+        for unit in ('B', 'KiB', 'MiB', 'GiB'):
+            if n < 1024:
+                return f'{n:.4g}{unit}'
+            n /= 1024
+        return f'{n:.4g}TiB'
+
     def get_container_stats(self):
-        """Get Docker container performance statistics"""
-        # Get stats in JSON format (no-stream means get one reading and exit)
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker stats {self.container_name} --no-stream --format "{{{{json .}}}}"'
+        """Get container performance statistics.
+
+        Samples /proc directly instead of running docker stats
+        --no-stream, which makes the daemon sample twice internally and
+        takes 1-2 seconds per call. One cat over the warm shell returns in
+        milliseconds; CPU% comes from tick deltas against the previous
+        sample (the first call after startup reports 0%).
+        """
+        sep = '___STATS___'
+        docker_cmd = (
+            f"pid=$({DOCKER_PATH} inspect --format '{{{{.State.Pid}}}}' {self.container_name}) && "
+            f"cat /proc/$pid/stat && echo {sep} && "
+            f"head -1 /proc/stat && echo {sep} && "
+            f"nproc && echo {sep} && "
+            f"grep VmRSS /proc/$pid/status && echo {sep} && "
+            f"grep MemTotal /proc/meminfo && echo {sep} && "
+            f"cat /proc/$pid/net/dev && echo {sep} && "
+            f"{{ cat /proc/$pid/io 2>/dev/null || true; }}"
+        )
         result = self._ssh_command(docker_cmd)
 
-        if result and result.returncode == 0:
-            import json
-            try:
-                stats = json.loads(result.stdout.strip())
-
-                # Parse CPU percentage (remove %)
-                cpu_percent = float(stats.get('CPUPerc', '0%').replace('%', ''))
-
-                # Parse memory usage
-                mem_usage = stats.get('MemUsage', '0B / 0B')
-                mem_parts = mem_usage.split(' / ')
-                mem_used = mem_parts[0] if len(mem_parts) > 0 else '0B'
-                mem_limit = mem_parts[1] if len(mem_parts) > 1 else '0B'
-                mem_percent = float(stats.get('MemPerc', '0%').replace('%', ''))
-
-                # Network I/O
-                net_io = stats.get('NetIO', '0B / 0B')
+        if not result or result.returncode != 0:
+            return {
+                'success': False,
+                'error': 'Failed to retrieve container stats'
+            }
 
-                # Block I/O (disk)
-                block_io = stats.get('BlockIO', '0B / 0B')
+        try:
+            (proc_stat, cpu_line, nproc, vmrss, memtotal,
+             net_dev, proc_io) = result.stdout.split(sep)
+
+            # utime + stime are the 14th/15th fields; the command name can
+            # contain spaces, so index from after the closing paren
+            stat_fields = proc_stat.rsplit(')', 1)[1].split()
+            proc_ticks = int(stat_fields[11]) + int(stat_fields[12])
+            total_ticks = sum(int(v) for v in cpu_line.split()[1:])
+            ncpu = int(nproc.strip())
+
+            cpu_percent = 0.0
+            prev = self._stats_sample
+            if prev is not None and total_ticks > prev['total']:
+                cpu_percent = round(
+                    (proc_ticks - prev['proc']) / (total_ticks - prev['total']) * ncpu * 100, 2)
+                cpu_percent = max(cpu_percent, 0.0)
+            self._stats_sample = {'proc': proc_ticks, 'total': total_ticks}
+
+            mem_used = int(vmrss.split()[1]) * 1024
+            mem_limit = int(memtotal.split()[1]) * 1024
+
+            # Per-interface rx/tx byte totals, excluding loopback
+            rx = tx = 0
+            for line in net_dev.splitlines():
+                if ':' not in line:
+                    continue
+                iface, _, counters = line.partition(':')
+                if iface.strip() == 'lo':
+                    continue
+                fields = counters.split()
+                rx += int(fields[0])
+                tx += int(fields[8])
+
+            # /proc/<pid>/io needs privileges; fall back to zeros quietly
+            read_bytes = write_bytes = 0
+            for line in proc_io.splitlines():
+                if line.startswith('read_bytes:'):
+                    read_bytes = int(line.split(':')[1])
+                elif line.startswith('write_bytes:'):
+                    write_bytes = int(line.split(':')[1])
 
-                return {
-                    'success': True,
-                    'cpu_percent': cpu_percent,
-                    'memory_used': mem_used,
-                    'memory_limit': mem_limit,
-                    'memory_percent': mem_percent,
-                    'network_io': net_io,
-                    'block_io': block_io,
-                    'raw_stats': stats
-                }
-            except Exception as e:
-                return {
-                    'success': False,
-                    'error': f'Failed to parse stats: {str(e)}'
+            return {
+                'success': True,
+                'cpu_percent': cpu_percent,
+                'memory_used': self._format_bytes(mem_used),
+                'memory_limit': self._format_bytes(mem_limit),
+                'memory_percent': round(mem_used / mem_limit * 100, 2) if mem_limit else 0.0,
+                'network_io': f'{self._format_bytes(rx)} / {self._format_bytes(tx)}',
+                'block_io': f'{self._format_bytes(read_bytes)} / {self._format_bytes(write_bytes)}',
+                'raw_stats': {
+                    'cpu_ticks': proc_ticks,
+                    'total_ticks': total_ticks,
+                    'ncpu': ncpu,
+                    'rss_bytes': mem_used,
+                    'rx_bytes': rx,
+                    'tx_bytes': tx
                 }
-        else:
+            }
+        except Exception as e:
             return {
                 'success': False,
-                'error': 'Failed to retrieve container stats'
+                'error': f'Failed to parse stats: {str(e)}'
             }
 
     def get_online_players(self):
         """Get list of online players by sending command and reading logs"""
-        import time
-
         # Send the list command
         self.send_command('list')
 
         # Wait a moment for the output to appear in logs
         time.sleep(0.5)
 
-        # Get recent logs
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker logs --tail 20 {self.container_name} 2>&1'
+        # Filter in-container: grep returns the "There are X/Y players
+        # online:" line plus what follows it, so only the relevant block
+        # crosses SSH instead of the whole tail. The || true keeps a
+        # missing header (scrolled out of the tail on a busy server) as a
+        # successful empty result rather than grep's exit 1
+        docker_cmd = (f'{DOCKER_PATH} logs --tail 20 {self.container_name} 2>&1 '
+                      f"| grep -A 20 -m1 -i 'players online:' || true")
         result = self._ssh_command(docker_cmd)
 
         if result and result.returncode == 0:
-            logs = result.stdout
             players = []
-
-            # Look for the player list in logs
-            # Format: "There are X/Y players online:" followed by player names on separate lines
-            lines = logs.split('\n')
-            found_player_line = False
-
-            for i, line in enumerate(lines):
-                if 'players online:' in line.lower():
-                    found_player_line = True
-                    # Get the lines after this one until we hit an empty line or different log entry
-                    for j in range(i + 1, len(lines)):
-                        next_line = lines[j].strip()
-                        # Stop if we hit a log timestamp or empty line
-                        if not next_line or '[' in next_line or 'INFO' in next_line:
-                            break
-                        players.append(next_line)
+            # First line is the header; names follow one per line until an
+            # empty line or the next timestamped log entry
+            for line in result.stdout.split('\n')[1:]:
+                line = line.strip()
+                if not line or '[' in line or 'INFO' in line:
                     break
+                players.append(line)
 
             return {'success': True, 'players': players}
         else:
@@ -333,7 +663,7 @@ class BedrockRemoteClient:
     def is_running(self):
         """Check if the container is running"""
         # Use double braces to escape the format string for SSH
-        docker_cmd = f"/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker ps --filter name={self.container_name} --format '{{{{.Status}}}}'"
+        docker_cmd = f"{DOCKER_PATH} ps --filter name={self.container_name} --format '{{{{.Status}}}}'"
         result = self._ssh_command(docker_cmd)
 
         if result and result.returncode == 0:
@@ -342,90 +672,80 @@ class BedrockRemoteClient:
         return False
 
     def get_server_properties(self):
-        """Read server.properties file from container"""
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} cat /data/server.properties'
+        """Read server.properties file from container (mtime-cached)"""
+        # Single round-trip: always report the mtime, only cat the file when
+        # it differs from the cached copy
+        cached_mtime = self._props_cache['mtime'] or '0'
+        docker_cmd = (
+            f'{DOCKER_PATH} exec -i {self.container_name} '
+            f'sh -c "m=\\$(stat -c %Y /data/server.properties) && echo \\$m && '
+            f'{{ [ \\$m = {cached_mtime} ] || cat /data/server.properties; }}"'
+        )
         result = self._ssh_command(docker_cmd)
 
         if result and result.returncode == 0:
+            mtime, _, body = result.stdout.partition('\n')
+            mtime = mtime.strip()
+            if mtime == self._props_cache['mtime'] and self._props_cache['properties'] is not None:
+                return {'success': True, 'properties': self._props_cache['properties']}
+
             properties = {}
-            for line in result.stdout.split('\n'):
+            for line in body.split('\n'):
                 line = line.strip()
                 if line and not line.startswith('#') and '=' in line:
                     key, value = line.split('=', 1)
                     properties[key.strip()] = value.strip()
+            self._props_cache = {'mtime': mtime, 'properties': properties, 'raw': body}
             return {'success': True, 'properties': properties}
         else:
             return {'success': False, 'error': 'Failed to read server.properties'}
 
     def update_server_properties(self, properties):
         """Update server.properties file in container"""
-        import tempfile
-        import os as os_module
-
-        # First, read the current file to preserve comments and structure
-        result = self.get_server_properties()
-        if not result['success']:
-            return result
-
-        # Build the updated properties content
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} cat /data/server.properties'
-        read_result = self._ssh_command(docker_cmd)
-
-        if not read_result or read_result.returncode != 0:
+        # Work from the cached raw text when we have it - saves go through
+        # this panel, so the cache is authoritative between writes and the
+        # whole save costs a single docker exec. Out-of-band edits were
+        # already last-writer-wins before the cache existed.
+        current_content = self._props_cache['raw']
+        if current_content is None:
+            result = self.get_server_properties()
+            if not result['success']:
+                return result
+            current_content = self._props_cache['raw']
+        if current_content is None:
             return {'success': False, 'error': 'Failed to read current properties'}
 
-        # Update the properties
-        lines = read_result.stdout.split('\n')
-        updated_lines = []
-        updated_keys = set()
-
-        for line in lines:
+        # Index key -> line number in one pass, then patch lines in place;
+        # comments, blank lines and ordering survive untouched and new keys
+        # append at the end
+        lines = current_content.split('\n')
+        key_to_index = {}
+        for i, line in enumerate(lines):
             stripped = line.strip()
             if stripped and not stripped.startswith('#') and '=' in stripped:
-                key = stripped.split('=', 1)[0].strip()
-                if key in properties:
-                    updated_lines.append(f"{key}={properties[key]}")
-                    updated_keys.add(key)
-                else:
-                    updated_lines.append(line)
-            else:
-                updated_lines.append(line)
+                key_to_index[stripped.split('=', 1)[0].strip()] = i
 
-        # Add any new properties that weren't in the file
         for key, value in properties.items():
-            if key not in updated_keys:
-                updated_lines.append(f"{key}={value}")
-
-        # Write via base64 encoding to avoid shell escaping issues
-        properties_content = '\n'.join(updated_lines)
-
-        # Use base64 to safely transfer the content
-        import base64
-        encoded_content = base64.b64encode(properties_content.encode('utf-8')).decode('ascii')
-
-        # Write using base64 decode - split into chunks if too long
-        max_chunk = 50000  # Safe chunk size for command line
-        if len(encoded_content) > max_chunk:
-            # For very large files, write in chunks
-            write_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "rm -f /data/server.properties.new"'
-            self._ssh_command(write_cmd)
-
-            for i in range(0, len(encoded_content), max_chunk):
-                chunk = encoded_content[i:i+max_chunk]
-                append_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "echo {chunk} >> /data/server.properties.new"'
-                result = self._ssh_command(append_cmd)
-                if not result or result.returncode != 0:
-                    return {'success': False, 'error': 'Failed to write properties chunk'}
-
-            # Decode and move
-            decode_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "base64 -d /data/server.properties.new > /data/server.properties && rm /data/server.properties.new"'
-            write_result = self._ssh_command(decode_cmd)
-        else:
-            # Single command for smaller files
-            write_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "echo {encoded_content} | base64 -d > /data/server.properties"'
-            write_result = self._ssh_command(write_cmd)
+            i = key_to_index.get(key)
+            if i is None:
+                lines.append(f"{key}={value}")
+            else:
+                lines[i] = f"{key}={value}"
+
+        # Stream the whole file through ssh stdin in one round-trip - no
+        # escaping (the content never touches a command line), no ARG_MAX
+        # limit, no base64 chunk loop
+        properties_content = '\n'.join(lines)
+        # Stage to a temp file and mv so a dropped connection can't leave
+        # a torn server.properties behind
+        write_cmd = (f'{DOCKER_PATH} exec -i {self.container_name} '
+                     f'sh -c "cat > /data/server.properties.tmp && mv /data/server.properties.tmp /data/server.properties"')
+        write_result = self._ssh_command(write_cmd, stdin_data=properties_content)
 
         if write_result and write_result.returncode == 0:
+            # Drop the cached copy so the next read re-parses (mtime
+            # granularity is one second, so don't trust it across a write)
+            self._props_cache = {'mtime': None, 'properties': None, 'raw': None}
             return {'success': True, 'message': 'Server properties updated. Restart server for changes to take effect.'}
         else:
             error_msg = write_result.stderr if write_result else 'Unknown error'
@@ -433,25 +753,25 @@ class BedrockRemoteClient:
 
     def get_whitelist(self):
         """Read allowlist.json from container (Bedrock uses allowlist not whitelist)"""
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec {self.container_name} cat /data/allowlist.json'
+        docker_cmd = f'{DOCKER_PATH} exec {self.container_name} cat /data/allowlist.json'
         result = self._ssh_command(docker_cmd)
 
         if result and result.returncode == 0:
+            # Empty file (fresh server) - skip the parser entirely
+            if not result.stdout.strip():
+                return {'success': True, 'whitelist': []}
             try:
-                import json
-                whitelist = json.loads(result.stdout)
+                whitelist = _json.loads(result.stdout)
                 return {'success': True, 'whitelist': whitelist}
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 return {'success': False, 'error': f'JSON decode error: {str(e)}'}
         else:
             # Check if file doesn't exist
             if result and 'No such file or directory' in result.stderr:
-                # Create empty allowlist file
-                import base64
-                empty_whitelist = '[]'
-                encoded = base64.b64encode(empty_whitelist.encode('utf-8')).decode('ascii')
-                create_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec {self.container_name} sh -c "echo {encoded} | base64 -d > /data/allowlist.json"'
-                create_result = self._ssh_command(create_cmd)
+                # Create empty allowlist file (content streamed over stdin,
+                # same as the server.properties write path)
+                create_cmd = f'{DOCKER_PATH} exec -i {self.container_name} sh -c "cat > /data/allowlist.json"'
+                create_result = self._ssh_command(create_cmd, stdin_data='[]')
 
                 if create_result and create_result.returncode == 0:
                     return {'success': True, 'whitelist': []}
@@ -463,25 +783,25 @@ class BedrockRemoteClient:
 
     def get_ops(self):
         """Read permissions.json from container"""
-        docker_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec {self.container_name} cat /data/permissions.json'
+        docker_cmd = f'{DOCKER_PATH} exec {self.container_name} cat /data/permissions.json'
         result = self._ssh_command(docker_cmd)
 
         if result and result.returncode == 0:
+            # Empty file (fresh server) - skip the parser entirely
+            if not result.stdout.strip():
+                return {'success': True, 'ops': []}
             try:
-                import json
-                ops = json.loads(result.stdout)
+                ops = _json.loads(result.stdout)
                 return {'success': True, 'ops': ops}
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 return {'success': False, 'error': f'JSON decode error: {str(e)}'}
         else:
             # Check if file doesn't exist
             if result and 'No such file or directory' in result.stderr:
-                # Create empty permissions file
-                import base64
-                empty_permissions = '[]'
-                encoded = base64.b64encode(empty_permissions.encode('utf-8')).decode('ascii')
-                create_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec {self.container_name} sh -c "echo {encoded} | base64 -d > /data/permissions.json"'
-                create_result = self._ssh_command(create_cmd)
+                # Create empty permissions file (content streamed over stdin,
+                # same as the server.properties write path)
+                create_cmd = f'{DOCKER_PATH} exec -i {self.container_name} sh -c "cat > /data/permissions.json"'
+                create_result = self._ssh_command(create_cmd, stdin_data='[]')
 
                 if create_result and create_result.returncode == 0:
                     return {'success': True, 'ops': []}
@@ -493,33 +813,31 @@ class BedrockRemoteClient:
 
     def list_backups(self):
         """List all world backups"""
-        # List all files in /data/backups directory (not just .tar.gz)
-        list_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "ls -lt /data/backups/ 2>/dev/null | grep -v ^d || echo NO_BACKUPS"'
+        # find -printf gives tab-separated machine-readable fields directly;
+        # parsing ls -l column positions breaks on filenames with spaces and
+        # varies between coreutils and busybox
+        list_cmd = (f'{DOCKER_PATH} exec -i {self.container_name} '
+                    f'sh -c "find /data/backups/ -maxdepth 1 -type f '
+                    f'-printf \'%T@\\t%s\\t%TY-%Tm-%Td %TH:%TM\\t%f\\n\' 2>/dev/null | sort -rn"')
         result = self._ssh_command(list_cmd)
 
         if result and result.returncode == 0:
             backups = []
             for line in result.stdout.split('\n'):
-                if line and not line.startswith('total') and 'NO_BACKUPS' not in line:
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        # Extract filename, size, and date
-                        filename = parts[-1]
-                        size = parts[4]
-                        date = ' '.join(parts[5:8])
-                        backups.append({
-                            'filename': filename,
-                            'size': size,
-                            'date': date
-                        })
+                parts = line.split('\t')
+                if len(parts) == 4:
+                    _, size, date, filename = parts
+                    backups.append({
+                        'filename': filename,
+                        'size': size,
+                        'date': date
+                    })
             return {'success': True, 'backups': backups}
         else:
             return {'success': False, 'error': 'Failed to list backups'}
 
     def create_backup(self, backup_name=None):
         """Create a backup of the current world"""
-        from datetime import datetime
-
         if not backup_name:
             backup_name = f"world_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tar.gz"
         else:
@@ -535,11 +853,18 @@ class BedrockRemoteClient:
         world_name = props_result['properties'].get('level-name', 'Bedrock level')
 
         # Create backups directory if it doesn't exist
-        mkdir_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} mkdir -p /data/backups'
+        mkdir_cmd = f'{DOCKER_PATH} exec -i {self.container_name} mkdir -p /data/backups'
         self._ssh_command(mkdir_cmd)
 
-        # Create backup (tar the world folder)
-        backup_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "cd /data/worlds && tar -czf /data/backups/{backup_name} \\"{world_name}\\""'
+        # Create backup (tar the world folder); shlex.quote handles world
+        # names with spaces or shell metacharacters. Compress through pigz
+        # when the container has it - gzip is single-threaded and dominates
+        # backup time on multi-gigabyte worlds; the archive format is
+        # identical either way
+        tar_cmd = (f'cd /data/worlds && '
+                   f'if command -v pigz >/dev/null 2>&1; then GZ="pigz -p 4"; else GZ=gzip; fi && '
+                   f'tar -cf - {shlex.quote(world_name)} | $GZ > /data/backups/{shlex.quote(backup_name)}')
+        backup_cmd = f'{DOCKER_PATH} exec -i {self.container_name} sh -c {shlex.quote(tar_cmd)}'
         result = self._ssh_command(backup_cmd)
 
         if result and result.returncode == 0:
@@ -551,7 +876,7 @@ class BedrockRemoteClient:
     def restore_backup(self, backup_filename):
         """Restore a world from backup"""
         # Validate filename to prevent path traversal
-        if not re.match(r'^[\w\-\.]+\.tar\.gz$', backup_filename):
+        if not _BACKUP_NAME_RE.match(backup_filename):
             return {'success': False, 'error': 'Invalid backup filename'}
         if '..' in backup_filename or '/' in backup_filename:
             return {'success': False, 'error': 'Invalid backup filename'}
@@ -564,14 +889,16 @@ class BedrockRemoteClient:
         world_name = props_result['properties'].get('level-name', 'Bedrock level')
 
         # Remove current world
-        remove_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "rm -rf /data/worlds/\\"{world_name}\\""'
+        rm_cmd = f'rm -rf /data/worlds/{shlex.quote(world_name)}'
+        remove_cmd = f'{DOCKER_PATH} exec -i {self.container_name} sh -c {shlex.quote(rm_cmd)}'
         remove_result = self._ssh_command(remove_cmd)
 
         if not remove_result or remove_result.returncode != 0:
             return {'success': False, 'error': 'Failed to remove current world'}
 
         # Extract backup
-        restore_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "cd /data/worlds && tar -xzf /data/backups/{backup_filename}"'
+        untar_cmd = f'cd /data/worlds && tar -xzf /data/backups/{shlex.quote(backup_filename)}'
+        restore_cmd = f'{DOCKER_PATH} exec -i {self.container_name} sh -c {shlex.quote(untar_cmd)}'
         result = self._ssh_command(restore_cmd)
 
         if result and result.returncode == 0:
@@ -583,12 +910,12 @@ class BedrockRemoteClient:
     def delete_backup(self, backup_filename):
         """Delete a backup file"""
         # Validate filename to prevent path traversal
-        if not re.match(r'^[\w\-\.]+\.tar\.gz$', backup_filename):
+        if not _BACKUP_NAME_RE.match(backup_filename):
             return {'success': False, 'error': 'Invalid backup filename'}
         if '..' in backup_filename or '/' in backup_filename:
             return {'success': False, 'error': 'Invalid backup filename'}
 
-        delete_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} rm /data/backups/{backup_filename}'
+        delete_cmd = f'{DOCKER_PATH} exec -i {self.container_name} rm /data/backups/{backup_filename}'
         result = self._ssh_command(delete_cmd)
 
         if result and result.returncode == 0:
@@ -616,38 +943,45 @@ class BedrockRemoteClient:
             if not update_result['success']:
                 return {'success': False, 'error': f'Failed to update seed in server.properties: {update_result.get("error", "Unknown error")}'}
 
-        # Remove current world
-        print(f"[create_new_world] Deleting world: {world_name}", flush=True)
-        remove_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker exec -i {self.container_name} sh -c "rm -rf /data/worlds/\\"{world_name}\\""'
-        result = self._ssh_command(remove_cmd)
+        rm_cmd = f'rm -rf /data/worlds/{shlex.quote(world_name)}'
+        remove_cmd = f'{DOCKER_PATH} exec -i {self.container_name} sh -c {shlex.quote(rm_cmd)}'
 
-        if result and result.returncode == 0:
-            # If auto_restart is enabled, restart the server to generate new world
-            if auto_restart:
-                print(f"[create_new_world] Auto-restarting server...", flush=True)
-                restart_result = self.restart_container()
-                if restart_result['success']:
-                    message = 'World deleted and server restarted! New world is generating...'
-                    if world_seed:
-                        message += f' With seed: {world_seed}'
-                    return {'success': True, 'message': message}
-                else:
-                    message = 'World deleted but failed to restart server. Please restart manually.'
-                    if world_seed:
-                        message += f' Seed {world_seed} is set and ready.'
-                    return {'success': False, 'error': message}
-            else:
-                message = 'Current world deleted. New world will generate on next server start.'
+        if auto_restart:
+            # Chain the restart onto the delete in one remote invocation
+            # instead of a second SSH round-trip
+            print(f"[create_new_world] Deleting world {world_name} and restarting server...", flush=True)
+            self._startup_version = None
+            self._version_cache = (None, 0.0)
+            restart_cmd = f'{DOCKER_PATH} restart {self.container_name}'
+            result = self._ssh_command(f'{remove_cmd} && {restart_cmd}', timeout=120)
+
+            if result and result.returncode == 0:
+                message = 'World deleted and server restarted! New world is generating...'
                 if world_seed:
                     message += f' With seed: {world_seed}'
                 return {'success': True, 'message': message}
+            else:
+                error_msg = result.stderr if result else 'Unknown error'
+                return {'success': False, 'error': f'Failed to delete world and restart: {error_msg}'}
+
+        # Remove current world, leave the container running
+        print(f"[create_new_world] Deleting world: {world_name}", flush=True)
+        result = self._ssh_command(remove_cmd)
+
+        if result and result.returncode == 0:
+            message = 'Current world deleted. New world will generate on next server start.'
+            if world_seed:
+                message += f' With seed: {world_seed}'
+            return {'success': True, 'message': message}
         else:
             error_msg = result.stderr if result else 'Unknown error'
             return {'success': False, 'error': f'Failed to delete world: {error_msg}'}
 
     def restart_container(self):
         """Restart the Minecraft server container"""
-        restart_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker restart {self.container_name}'
+        self._startup_version = None
+        self._version_cache = (None, 0.0)
+        restart_cmd = f'{DOCKER_PATH} restart {self.container_name}'
         result = self._ssh_command(restart_cmd, timeout=120)  # 2 min timeout for restart
 
         if result and result.returncode == 0:
@@ -658,7 +992,7 @@ class BedrockRemoteClient:
 
     def stop_container(self):
         """Stop the Minecraft server container"""
-        stop_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker stop {self.container_name}'
+        stop_cmd = f'{DOCKER_PATH} stop {self.container_name}'
         result = self._ssh_command(stop_cmd, timeout=60)  # 1 min timeout for stop
 
         if result and result.returncode == 0:
@@ -669,7 +1003,9 @@ class BedrockRemoteClient:
 
     def start_container(self):
         """Start the Minecraft server container"""
-        start_cmd = f'/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker start {self.container_name}'
+        self._startup_version = None
+        self._version_cache = (None, 0.0)
+        start_cmd = f'{DOCKER_PATH} start {self.container_name}'
         result = self._ssh_command(start_cmd, timeout=60)
 
         if result and result.returncode == 0:
@@ -680,51 +1016,75 @@ class BedrockRemoteClient:
 
     def update_server(self):
         """Update the Minecraft Bedrock server by removing cached binary and restarting"""
-        docker_path = '/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker'
-
-        # Step 1: Get the data volume path from container
-        inspect_cmd = f'{docker_path} inspect {self.container_name} --format "{{{{range .Mounts}}}}{{{{if eq .Destination \\"/data\\"}}}}{{{{.Source}}}}{{{{end}}}}{{{{end}}}}"'
-        inspect_result = self._ssh_command(inspect_cmd, timeout=30)
-
-        if not inspect_result or inspect_result.returncode != 0 or not inspect_result.stdout.strip():
-            return {'success': False, 'error': 'Failed to find data volume path', 'step': 'inspect'}
-
-        data_path = inspect_result.stdout.strip()
-
-        # Step 2: Get current version before update
-        version_cmd = f'{docker_path} logs --tail 100 {self.container_name} 2>&1 | grep -o "Version: [0-9.]*" | tail -1'
-        version_result = self._ssh_command(version_cmd, timeout=15)
-        old_version = version_result.stdout.strip() if version_result else 'Unknown'
-
-        # Step 3: Stop the container
-        stop_cmd = f'{docker_path} stop {self.container_name}'
-        stop_result = self._ssh_command(stop_cmd, timeout=60)
-
-        if not stop_result or stop_result.returncode != 0:
+        self._startup_version = None
+        self._version_cache = (None, 0.0)
+
+        # Step 1: Get the data volume path from container (cached - the
+        # mount never changes for the container's lifetime)
+        if self._data_mount is None:
+            inspect_cmd = f'{DOCKER_PATH} inspect {self.container_name} --format "{{{{range .Mounts}}}}{{{{if eq .Destination \\"/data\\"}}}}{{{{.Source}}}}{{{{end}}}}{{{{end}}}}"'
+            inspect_result = self._ssh_command(inspect_cmd, timeout=30)
+
+            if not inspect_result or inspect_result.returncode != 0 or not inspect_result.stdout.strip():
+                return {'success': False, 'error': 'Failed to find data volume path', 'step': 'inspect'}
+
+            self._data_mount = inspect_result.stdout.strip()
+
+        data_path = self._data_mount
+
+        # Steps 2-7 run as one remote script instead of six sequential SSH
+        # round-trips: old-version probe, stop, remove cached binary, pull
+        # (best effort), start, wait for the re-download, new-version
+        # probe. Markers delimit the values Python needs to parse back out
+        # The version line lands within the last few entries after startup,
+        # so a 30-line tail is plenty and streams a third of the bytes
+        version_probe = f'{DOCKER_PATH} logs --tail 30 {self.container_name} 2>&1 | grep -o "Version: [0-9.]*" | tail -1'
+        # The destructive rm and the pull/start only run if the stop
+        # succeeded; on a failed stop the script ends after ::RC_STOP::
+        # and the rc check below reports the stop error
+        script = (
+            f'echo ::OLD::; {version_probe}; echo ::ENDOLD::; '
+            f'{DOCKER_PATH} stop {self.container_name}; rc=$?; echo ::RC_STOP::$rc; '
+            f'[ $rc -eq 0 ] && {{ rm -f {data_path}/bedrock_server-*; '
+            f'{DOCKER_PATH} pull itzg/minecraft-bedrock-server:latest; '
+            f'{DOCKER_PATH} start {self.container_name}; echo ::RC_START::$?; }}'
+        )
+        result = self._ssh_command(script, timeout=480)
+
+        if not result:
+            return {'success': False, 'error': 'Update command timed out or SSH failed', 'step': 'update'}
+
+        out = result.stdout
+        old_match = _UPD_OLD_RE.search(out)
+        old_version = old_match.group(1).strip() if old_match else 'Unknown'
+        old_version = old_version or 'Unknown'
+
+        rc_stop = _UPD_RC_STOP_RE.search(out)
+        if not rc_stop or rc_stop.group(1) != '0':
             return {'success': False, 'error': 'Failed to stop container', 'step': 'stop'}
 
-        # Step 4: Remove the cached bedrock_server binary to force re-download
-        rm_cmd = f'rm -f {data_path}/bedrock_server-*'
-        rm_result = self._ssh_command(rm_cmd, timeout=30)
-
-        # Step 5: Pull latest Docker image (in case there are container updates)
-        pull_cmd = f'{docker_path} pull itzg/minecraft-bedrock-server:latest'
-        self._ssh_command(pull_cmd, timeout=300)  # Best effort, continue even if fails
-
-        # Step 6: Start the container (it will download the latest Bedrock server)
-        start_cmd = f'{docker_path} start {self.container_name}'
-        start_result = self._ssh_command(start_cmd, timeout=60)
-
-        if not start_result or start_result.returncode != 0:
+        rc_start = _UPD_RC_START_RE.search(out)
+        if not rc_start or rc_start.group(1) != '0':
             return {'success': False, 'error': 'Failed to start container after update', 'step': 'start'}
 
-        # Step 7: Wait for server to download and start, then get new version
-        import time
-        time.sleep(45)  # Give it time to download and start
-
-        new_version_cmd = f'{docker_path} logs --tail 100 {self.container_name} 2>&1 | grep -o "Version: [0-9.]*" | tail -1'
-        new_version_result = self._ssh_command(new_version_cmd, timeout=15)
-        new_version = new_version_result.stdout.strip() if new_version_result else 'Unknown'
+        # Poll for the new version instead of a fixed 45 s sleep: a fast
+        # start reports in seconds, a slow download gets up to 90 s. The
+        # log tail still holds the pre-restart version line, so an
+        # unchanged version only counts once the old wait has elapsed
+        new_version = 'Unknown'
+        start_ts = time.monotonic()
+        while time.monotonic() - start_ts < 90:
+            probe = self._ssh_command(version_probe, timeout=10)
+            v = probe.stdout.strip() if probe else ''
+            if v and v != old_version:
+                new_version = v
+                break
+            if v and time.monotonic() - start_ts >= 45:
+                # Same version still on top after the settle window -
+                # the server was already latest
+                new_version = v
+                break
+            time.sleep(3)
 
         if old_version != new_version and new_version != 'Unknown':
             return {'success': True, 'message': f'Updated from {old_version} to {new_version}', 'updated': True, 'old_version': old_version, 'new_version': new_version}
@@ -733,18 +1093,44 @@ class BedrockRemoteClient:
         else:
             return {'success': True, 'message': 'Server restarted, check logs for version', 'updated': True}
 
+    def get_startup_version(self):
+        """Get the server version from startup logs, cached per container start"""
+        if self._startup_version:
+            return self._startup_version
+
+        # Version info appears at the top of the logs, so head not tail
+        docker_cmd = f'{DOCKER_PATH} logs {self.container_name} 2>&1 | head -100'
+        result = self._ssh_command(docker_cmd)
+        if result and result.returncode == 0:
+            match = VERSION_RE.search(result.stdout) or DOWNLOAD_VERSION_RE.search(result.stdout)
+            if match:
+                self._startup_version = match.group(1)
+        return self._startup_version
+
     def get_server_version(self):
-        """Get the current Minecraft Bedrock server version from logs"""
-        docker_path = '/share/CACHEDEV1_DATA/.qpkg/container-station/bin/docker'
-        # Look for version in recent logs
-        logs_cmd = f'{docker_path} logs --tail 50 {self.container_name} 2>&1 | grep -i "Version"'
+        """Get the current Minecraft Bedrock server version from logs.
+
+        The version only changes on restart or update, so successful
+        lookups are cached for five minutes; update_server and the
+        container start/restart paths drop the cache by resetting
+        _startup_version and this entry together.
+        """
+        version, ts = self._version_cache
+        if version is not None and time.monotonic() - ts < self._VERSION_TTL:
+            return {'success': True, 'version': version}
+
+        # Look for version in recent logs (small tail - the line sits near
+        # the end shortly after startup)
+        logs_cmd = f'{DOCKER_PATH} logs --tail 30 {self.container_name} 2>&1 | grep -i "Version"'
         result = self._ssh_command(logs_cmd, timeout=15)
 
         if result and result.returncode == 0 and result.stdout.strip():
-            # Parse version from log line
-            for line in result.stdout.split('\n'):
-                if 'Version' in line:
-                    return {'success': True, 'version': line.strip()}
+            # One regex pass over the blob instead of splitting into lines
+            match = VERSION_RE.search(result.stdout)
+            if match:
+                version = match.group(0).strip()
+                self._version_cache = (version, time.monotonic())
+                return {'success': True, 'version': version}
         return {'success': False, 'version': 'Unknown'}
 
 # For local testing without SSH (when running on same host)
@@ -753,17 +1139,24 @@ class BedrockLocalClient:
     
     def __init__(self, container_name=None):
         self.container_name = container_name or os.getenv('CONTAINER_NAME', 'minecraft-bedrock-server')
+        # Resolve the binary once; spawning by bare name repeats the PATH
+        # walk (a stat per entry) on every subprocess
+        self._docker = shutil.which('docker') or 'docker'
+
+        # server.properties cache keyed by the file's mtime
+        self._props_cache = {'mtime': None, 'properties': None, 'raw': None}
     
     def send_command(self, command):
         """Send a command to the Minecraft server console"""
         try:
             docker_cmd = [
-                'docker', 'exec', '-i', self.container_name,
+                self._docker, 'exec', '-i', self.container_name,
                 'mc-send-to-console', command
             ]
             result = subprocess.run(
                 docker_cmd,
                 capture_output=True,
+                stdin=subprocess.DEVNULL,
                 text=True,
                 timeout=5
             )
@@ -781,8 +1174,9 @@ class BedrockLocalClient:
         """Get recent server logs"""
         try:
             result = subprocess.run(
-                ['docker', 'logs', '--tail', str(lines), self.container_name],
+                [self._docker, 'logs', '--tail', str(lines), self.container_name],
                 capture_output=True,
+                stdin=subprocess.DEVNULL,
                 text=True
             )
             return {
@@ -796,8 +1190,9 @@ class BedrockLocalClient:
         """Check if the container is running"""
         try:
             result = subprocess.run(
-                ['docker', 'ps', '--filter', f'name={self.container_name}', '--format', '{{.Status}}'],
+                [self._docker, 'ps', '--filter', f'name={self.container_name}', '--format', '{{.Status}}'],
                 capture_output=True,
+                stdin=subprocess.DEVNULL,
                 text=True
             )
             return 'Up' in result.stdout
@@ -805,22 +1200,34 @@ class BedrockLocalClient:
             return False
 
     def get_server_properties(self):
-        """Read server.properties file from container"""
+        """Read server.properties file from container (mtime-cached)"""
         try:
+            # Same single-round-trip scheme as BedrockRemoteClient: always
+            # report the mtime, only cat the file when it changed
+            cached_mtime = self._props_cache['mtime'] or '0'
+            script = ('m=$(stat -c %Y /data/server.properties) && echo $m && '
+                      f'{{ [ $m = {cached_mtime} ] || cat /data/server.properties; }}')
             result = subprocess.run(
-                ['docker', 'exec', '-i', self.container_name, 'cat', '/data/server.properties'],
+                [self._docker, 'exec', '-i', self.container_name, 'sh', '-c', script],
                 capture_output=True,
+                stdin=subprocess.DEVNULL,
                 text=True,
                 timeout=5
             )
 
             if result.returncode == 0:
+                mtime, _, body = result.stdout.partition('\n')
+                mtime = mtime.strip()
+                if mtime == self._props_cache['mtime'] and self._props_cache['properties'] is not None:
+                    return {'success': True, 'properties': self._props_cache['properties']}
+
                 properties = {}
-                for line in result.stdout.split('\n'):
+                for line in body.split('\n'):
                     line = line.strip()
                     if line and not line.startswith('#') and '=' in line:
                         key, value = line.split('=', 1)
                         properties[key.strip()] = value.strip()
+                self._props_cache = {'mtime': mtime, 'properties': properties, 'raw': body}
                 return {'success': True, 'properties': properties}
             else:
                 return {'success': False, 'error': 'Failed to read server.properties'}
@@ -830,43 +1237,38 @@ class BedrockLocalClient:
     def update_server_properties(self, properties):
         """Update server.properties file in container"""
         try:
-            # First, read the current file
-            read_result = subprocess.run(
-                ['docker', 'exec', '-i', self.container_name, 'cat', '/data/server.properties'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if read_result.returncode != 0:
+            # Work from the cached raw text when available (see the remote
+            # client for the staleness reasoning); read only on a cold cache
+            current_content = self._props_cache['raw']
+            if current_content is None:
+                read_result = self.get_server_properties()
+                if not read_result['success']:
+                    return read_result
+                current_content = self._props_cache['raw']
+            if current_content is None:
                 return {'success': False, 'error': 'Failed to read current properties'}
 
-            # Update the properties
-            lines = read_result.stdout.split('\n')
-            updated_lines = []
-            updated_keys = set()
-
-            for line in lines:
+            # Index key -> line number in one pass, then patch lines in
+            # place (same scheme as BedrockRemoteClient); new keys append
+            # at the end
+            lines = current_content.split('\n')
+            key_to_index = {}
+            for i, line in enumerate(lines):
                 stripped = line.strip()
                 if stripped and not stripped.startswith('#') and '=' in stripped:
-                    key = stripped.split('=', 1)[0].strip()
-                    if key in properties:
-                        updated_lines.append(f"{key}={properties[key]}")
-                        updated_keys.add(key)
-                    else:
-                        updated_lines.append(line)
-                else:
-                    updated_lines.append(line)
+                    key_to_index[stripped.split('=', 1)[0].strip()] = i
 
-            # Add any new properties
             for key, value in properties.items():
-                if key not in updated_keys:
-                    updated_lines.append(f"{key}={value}")
+                i = key_to_index.get(key)
+                if i is None:
+                    lines.append(f"{key}={value}")
+                else:
+                    lines[i] = f"{key}={value}"
 
             # Write back to container
-            properties_content = '\n'.join(updated_lines)
+            properties_content = '\n'.join(lines)
             write_result = subprocess.run(
-                ['docker', 'exec', '-i', self.container_name, 'sh', '-c',
+                [self._docker, 'exec', '-i', self.container_name, 'sh', '-c',
                  f'cat > /data/server.properties'],
                 input=properties_content,
                 capture_output=True,
@@ -875,6 +1277,9 @@ class BedrockLocalClient:
             )
 
             if write_result.returncode == 0:
+                # Drop the cached copy so the next read re-parses (mtime
+                # granularity is one second, so don't trust it across a write)
+                self._props_cache = {'mtime': None, 'properties': None, 'raw': None}
                 return {'success': True, 'message': 'Server properties updated. Restart server for changes to take effect.'}
             else:
                 return {'success': False, 'error': f'Failed to write: {write_result.stderr}'}
@@ -884,44 +1289,51 @@ class BedrockLocalClient:
     def get_whitelist(self):
         """Read allowlist.json from container (Bedrock uses allowlist not whitelist)"""
         try:
-            import json
+            # No text=True: the parser takes the raw bytes directly, which
+            # skips one full decode pass over the blob
             result = subprocess.run(
-                ['docker', 'exec', '-i', self.container_name, 'cat', '/data/allowlist.json'],
+                [self._docker, 'exec', '-i', self.container_name, 'cat', '/data/allowlist.json'],
                 capture_output=True,
-                text=True,
+                stdin=subprocess.DEVNULL,
                 timeout=5
             )
 
             if result.returncode == 0:
+                if not result.stdout.strip():
+                    return {'success': True, 'whitelist': []}
                 try:
-                    whitelist = json.loads(result.stdout)
+                    whitelist = _json.loads(result.stdout)
                     return {'success': True, 'whitelist': whitelist}
-                except json.JSONDecodeError:
+                except ValueError:
                     return {'success': True, 'whitelist': []}
             else:
-                return {'success': False, 'error': f'Failed to read whitelist: {result.stderr}'}
+                stderr = result.stderr.decode(errors='replace')
+                return {'success': False, 'error': f'Failed to read whitelist: {stderr}'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
     def get_ops(self):
         """Read permissions.json from container"""
         try:
-            import json
+            # Raw bytes straight into the parser, as in get_whitelist
             result = subprocess.run(
-                ['docker', 'exec', '-i', self.container_name, 'cat', '/data/permissions.json'],
+                [self._docker, 'exec', '-i', self.container_name, 'cat', '/data/permissions.json'],
                 capture_output=True,
-                text=True,
+                stdin=subprocess.DEVNULL,
                 timeout=5
             )
 
             if result.returncode == 0:
+                if not result.stdout.strip():
+                    return {'success': True, 'ops': []}
                 try:
-                    ops = json.loads(result.stdout)
+                    ops = _json.loads(result.stdout)
                     return {'success': True, 'ops': ops}
-                except json.JSONDecodeError:
+                except ValueError:
                     return {'success': True, 'ops': []}
             else:
-                return {'success': False, 'error': f'Failed to read permissions: {result.stderr}'}
+                stderr = result.stderr.decode(errors='replace')
+                return {'success': False, 'error': f'Failed to read permissions: {stderr}'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
@@ -929,8 +1341,9 @@ class BedrockLocalClient:
         """Restart the Minecraft server container"""
         try:
             result = subprocess.run(
-                ['docker', 'restart', self.container_name],
+                [self._docker, 'restart', self.container_name],
                 capture_output=True,
+                stdin=subprocess.DEVNULL,
                 text=True,
                 timeout=30
             )
@@ -945,8 +1358,9 @@ class BedrockLocalClient:
         """Stop the Minecraft server container"""
         try:
             result = subprocess.run(
-                ['docker', 'stop', self.container_name],
+                [self._docker, 'stop', self.container_name],
                 capture_output=True,
+                stdin=subprocess.DEVNULL,
                 text=True,
                 timeout=30
             )
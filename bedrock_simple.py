@@ -1,14 +1,44 @@
 import subprocess
 import os
+import select
+import socket
+import struct
+
+# RakNet Unconnected Ping: packet id 0x01, send time, protocol magic,
+# client GUID. Bedrock answers with an Unconnected Pong carrying server
+# info, so a reply means the server process itself is up (not just that
+# the port didn't reject the packet).
+_RAKNET_MAGIC = b'\x00\xff\xff\x00\xfe\xfe\xfe\xfe\xfd\xfd\xfd\xfd\x12\x34\x56\x78'
+_RAKNET_PING = b'\x01' + struct.pack('>Q', 0) + _RAKNET_MAGIC + struct.pack('>Q', 2)
+
 
 class BedrockSimpleClient:
     """Simple client that assumes the Minecraft server is accessible at the configured host"""
-    
-    def __init__(self, host='localhost', container_name='minecraft-bedrock'):
-        self.host = host
+
+    def __init__(self, host=None, container_name='minecraft-bedrock'):
+        self.host = host or os.getenv('SERVER_HOST', 'localhost')
         self.container_name = container_name
         self.game_port = 19132
-    
+        # One non-blocking probe socket reused across liveness checks
+        self._probe_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._probe_sock.setblocking(False)
+
+    def _ping_server(self, timeout=0.3):
+        """Send a RakNet ping and wait briefly for the pong"""
+        try:
+            # Drain any stale reply from a previous probe
+            while select.select([self._probe_sock], [], [], 0)[0]:
+                self._probe_sock.recvfrom(2048)
+
+            self._probe_sock.sendto(_RAKNET_PING, (self.host, self.game_port))
+            readable, _, _ = select.select([self._probe_sock], [], [], timeout)
+            if readable:
+                self._probe_sock.recvfrom(2048)
+                return True
+        except Exception as e:
+            print(f"Port check failed: {e}")
+        return False
+
     def send_command(self, command):
         """For Bedrock without console access, we can only return predefined responses"""
         # Since we can't directly access the console without SSH/Docker access,
@@ -25,23 +55,16 @@ class BedrockSimpleClient:
                 'response': 'Available commands:\n- list: Show server info\n- status: Check if server is reachable\n\nFor full console access, SSH needs to be configured.'
             }
         elif command.lower() == 'status':
-            # Try to check if the game port is open
-            import socket
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.settimeout(2)
-                sock.sendto(b'\x01\x00\x00\x00\x00\x00\x00\x00\x00', (self.host, self.game_port))
-                data, addr = sock.recvfrom(1024)
-                sock.close()
+            # Try to ping the game port
+            if self._ping_server():
                 return {
                     'success': True,
                     'response': f'Server is responding at {self.host}:{self.game_port}'
                 }
-            except:
-                return {
-                    'success': False,
-                    'response': f'Cannot reach server at {self.host}:{self.game_port}'
-                }
+            return {
+                'success': False,
+                'response': f'Cannot reach server at {self.host}:{self.game_port}'
+            }
         else:
             return {
                 'success': False,
@@ -56,25 +79,28 @@ class BedrockSimpleClient:
         }
     
     def is_running(self):
-        """Check if the server is reachable on the game port"""
-        import socket
-        try:
-            # Simple UDP port check
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(2)
-            # Send a simple ping packet
-            sock.sendto(b'ping', (self.host, self.game_port))
-            # We don't need to wait for response, if sendto succeeds, port is open
-            sock.close()
-            return True
-        except Exception as e:
-            print(f"Port check failed: {e}")
-            return False
+        """Check if the server answers a RakNet ping on the game port"""
+        return self._ping_server()
+
+    def send_commands(self, commands):
+        """Send several commands - no batching possible without SSH"""
+        result = {'success': True, 'response': ''}
+        for command in commands:
+            result = self.send_command(command)
+        return result
 
     def send_command_with_output(self, command):
         """Send command and return output - limited functionality without SSH"""
         return self.send_command(command)
 
+    def get_startup_version(self):
+        """Get server version from logs - not available without SSH"""
+        return None
+
+    def open_log_stream(self):
+        """Follow server logs - not available without SSH"""
+        return None
+
     def get_online_players(self):
         """Get online players - not available without SSH"""
         return {'success': False, 'players': [], 'error': 'Requires SSH configuration'}
@@ -3,6 +3,8 @@ Configuration management for Minecraft Bedrock Admin Panel
 Handles server connection settings and setup flow
 """
 
+import hashlib
+import hmac
 import json
 import os
 import re
@@ -17,11 +19,39 @@ except ImportError:
     BCRYPT_AVAILABLE = False
     print("Warning: bcrypt not installed, passwords will be stored in plaintext")
 
+# orjson is substantially faster than the stdlib json module; fall back
+# transparently when it isn't installed. Both helpers deal in bytes and
+# keep the 2-space indent so the config file stays hand-editable.
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2).encode('utf-8')
+
 
 # =============================================================================
 # Security Validators - Prevent command injection via config values
 # =============================================================================
 
+# Precompiled once; the validators run on every settings save. Each pattern
+# encodes both the allowed charset and the length limit, so a single match
+# covers what used to be separate length, charset, and metacharacter scans.
+# The allowed charsets exclude every shell metacharacter, so anything that
+# could enable injection fails the match.
+_CONTAINER_NAME_RE = re.compile(r'^[a-zA-Z0-9][a-zA-Z0-9_.-]{0,127}\Z')
+_SSH_HOST_RE = re.compile(r'^[a-zA-Z0-9.\-:]{1,253}\Z')
+_SERVER_HOST_RE = re.compile(r'^[a-zA-Z0-9.\-:\[\]]{1,253}\Z')
+_SSH_USER_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]{0,31}\Z')
+
 def validate_container_name(name: str) -> Tuple[bool, str]:
     """
     Validate Docker container name.
@@ -32,12 +62,11 @@ def validate_container_name(name: str) -> Tuple[bool, str]:
         return False, "Container name is required"
     
     name = name.strip()
-    if len(name) < 1 or len(name) > 128:
-        return False, "Container name must be 1-128 characters"
-    
-    if not re.match(r'^[a-zA-Z0-9][a-zA-Z0-9_.-]*$', name):
+    if not _CONTAINER_NAME_RE.match(name):
+        if len(name) < 1 or len(name) > 128:
+            return False, "Container name must be 1-128 characters"
         return False, "Container name can only contain letters, numbers, underscores, hyphens, and dots"
-    
+
     return True, ""
 
 
@@ -51,22 +80,15 @@ def validate_ssh_host(host: str) -> Tuple[bool, str]:
         return False, "SSH host is required"
     
     host = host.strip()
-    if len(host) > 253:  # Max DNS name length
-        return False, "SSH host too long"
-    
-    # Block dangerous characters that could enable injection
-    dangerous_chars = [';', '|', '`', '$', '>', '<', '\\', '\n', '\r', ' ', '\t', "'", '"', '&', '(', ')', '{', '}', '[', ']']
-    for char in dangerous_chars:
-        if char in host:
-            return False, f"SSH host contains invalid character"
-    
-    # Allow: alphanumeric, dots, hyphens, colons (IPv6), brackets (IPv6)
+    # Allow: alphanumeric, dots, hyphens, colons (IPv6)
     # IPv4: 192.168.1.1
-    # IPv6: ::1, fe80::1, [::1]
+    # IPv6: ::1, fe80::1
     # Hostname: my-server.local, nas.home
-    if not re.match(r'^[a-zA-Z0-9.\-:\[\]]+$', host):
+    if not _SSH_HOST_RE.match(host):
+        if len(host) > 253:  # Max DNS name length
+            return False, "SSH host too long"
         return False, "SSH host contains invalid characters"
-    
+
     return True, ""
 
 
@@ -80,19 +102,12 @@ def validate_ssh_user(user: str) -> Tuple[bool, str]:
         return False, "SSH user is required"
     
     user = user.strip()
-    if len(user) < 1 or len(user) > 32:
-        return False, "SSH user must be 1-32 characters"
-    
-    # Block injection attempts
-    dangerous_chars = [';', '|', '`', '$', '>', '<', '\\', '\n', '\r', ' ', '\t', "'", '"', '&', '@', '(', ')']
-    for char in dangerous_chars:
-        if char in user:
-            return False, f"SSH user contains invalid character"
-    
     # Standard Unix username pattern (relaxed to allow uppercase)
-    if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_-]*$', user):
+    if not _SSH_USER_RE.match(user):
+        if len(user) < 1 or len(user) > 32:
+            return False, "SSH user must be 1-32 characters"
         return False, "SSH user contains invalid characters"
-    
+
     return True, ""
 
 
@@ -105,56 +120,39 @@ def validate_server_host(host: str) -> Tuple[bool, str]:
         return False, "Server host is required"
     
     host = host.strip()
-    if len(host) > 253:
-        return False, "Server host too long"
-    
-    # Block dangerous characters
-    dangerous_chars = [';', '|', '`', '$', '>', '<', '\\', '\n', '\r', ' ', '\t', "'", '"', '&', '(', ')', '{', '}']
-    for char in dangerous_chars:
-        if char in host:
-            return False, f"Server host contains invalid character"
-    
-    if not re.match(r'^[a-zA-Z0-9.\-:\[\]]+$', host):
+    if not _SERVER_HOST_RE.match(host):
+        if len(host) > 253:
+            return False, "Server host too long"
         return False, "Server host contains invalid characters"
-    
+
     return True, ""
 
 
+# (field, validator, error prefix, only checked for ssh connections)
+_SERVER_FIELD_VALIDATORS = (
+    ('container_name', validate_container_name, 'Container name', False),
+    ('server_host', validate_server_host, 'Server host', False),
+    ('ssh_host', validate_ssh_host, 'SSH host', True),
+    ('ssh_user', validate_ssh_user, 'SSH user', True),
+)
+
+
 def validate_server_config(server_config: Dict[str, str]) -> Tuple[bool, str]:
     """
     Validate all server configuration fields.
     Returns (is_valid, error_message)
     """
-    connection_type = server_config.get('connection_type', 'ssh')
-    
-    # Validate container name (always required)
-    container_name = server_config.get('container_name', '')
-    if container_name:
-        valid, error = validate_container_name(container_name)
-        if not valid:
-            return False, f"Container name: {error}"
-    
-    # Validate server host (always required)
-    server_host = server_config.get('server_host', '')
-    if server_host:
-        valid, error = validate_server_host(server_host)
-        if not valid:
-            return False, f"Server host: {error}"
-    
-    # SSH-specific validation
-    if connection_type == 'ssh':
-        ssh_host = server_config.get('ssh_host', '')
-        if ssh_host:
-            valid, error = validate_ssh_host(ssh_host)
-            if not valid:
-                return False, f"SSH host: {error}"
-        
-        ssh_user = server_config.get('ssh_user', '')
-        if ssh_user:
-            valid, error = validate_ssh_user(ssh_user)
+    ssh_mode = server_config.get('connection_type', 'ssh') == 'ssh'
+
+    for field, validator, prefix, ssh_only in _SERVER_FIELD_VALIDATORS:
+        if ssh_only and not ssh_mode:
+            continue
+        value = server_config.get(field, '')
+        if value:
+            valid, error = validator(value)
             if not valid:
-                return False, f"SSH user: {error}"
-    
+                return False, f"{prefix}: {error}"
+
     return True, ""
 
 
@@ -163,45 +161,90 @@ class Config:
 
     CONFIG_FILE = "/app/data/server_config.json"
 
-    # Default configuration structure
-    DEFAULT_CONFIG = {
-        "setup_completed": False,
-        "server": {
-            "container_name": "",
-            "server_host": "",
-            "ssh_host": "",
-            "ssh_user": "",
-            "connection_type": "ssh"  # 'ssh' or 'local'
-        },
-        "map": {
-            "enabled": False,
-            "url": "",
-            "type": "unmined"  # 'unmined', 'chunkbase', or 'custom'
-        },
-        "admin": {
-            "username": "",
-            "password_hash": ""  # Stored as bcrypt hash
-        },
-        "security": {
-            "secret_key": "",  # Auto-generated on first run
-            "ssl_verify": True  # Set to False for self-signed certs
+    @staticmethod
+    def _make_default() -> Dict[str, Any]:
+        """Build a fresh default configuration structure.
+
+        A factory rather than a class-level template: every call returns
+        brand-new nested dicts, so callers can mutate the result without
+        aliasing into a shared default (the bug dict.copy() had) and
+        without a deepcopy traversal.
+        """
+        return {
+            "setup_completed": False,
+            "server": {
+                "container_name": "",
+                "server_host": "",
+                "ssh_host": "",
+                "ssh_user": "",
+                "connection_type": "ssh"  # 'ssh' or 'local'
+            },
+            "map": {
+                "enabled": False,
+                "url": "",
+                "type": "unmined"  # 'unmined', 'chunkbase', or 'custom'
+            },
+            "admin": {
+                "username": "",
+                "password_hash": ""  # Stored as bcrypt hash
+            },
+            "security": {
+                "secret_key": "",  # Auto-generated on first run
+                "ssl_verify": True  # Set to False for self-signed certs
+            }
         }
-    }
 
     def __init__(self):
         self.config_path = Path(self.CONFIG_FILE)
+        self._flat = {}
+        self._saved_bytes = None
+        # (sha256 digest, hash) of the last password that verified; lets
+        # repeat logins skip the deliberately slow bcrypt check. Only
+        # successes are cached so failed guesses can't grow memory.
+        self._verify_cache = None
         self.config = self._load_config()
         self._ensure_security_settings()
+        self._rebuild_flat()
+        # Live views of the two sections the request handlers read; the
+        # update_* methods mutate these same dicts so the aliases stay valid
+        self._server = self.config.setdefault('server', {})
+        self._admin = self.config.setdefault('admin', {})
+        # Fixed after _ensure_security_settings has run; cached so session
+        # handling never walks the config tree
+        self._secret_key = self.config.get('security', {}).get('secret_key', 'fallback-key-change-me')
+
+    def _rebuild_flat(self):
+        """Precompute the dot-notation view of the config tree.
+
+        get() is called several times per request for keys like
+        'server.ssh_host'; a flat dict turns each lookup into one hash
+        probe instead of a split + nested walk. Rebuilt on every save(),
+        which all mutation paths go through.
+        """
+        flat = {}
+
+        def _walk(prefix, node):
+            for k, v in node.items():
+                dotted = f'{prefix}{k}'
+                if isinstance(v, dict):
+                    _walk(f'{dotted}.', v)
+                else:
+                    flat[dotted] = v
+
+        _walk('', self.config)
+        self._flat = flat
 
     def _ensure_security_settings(self):
         """Ensure security settings exist and secret_key is generated"""
         if 'security' not in self.config:
-            self.config['security'] = self.DEFAULT_CONFIG['security'].copy()
+            self.config['security'] = self._make_default()['security']
+
+        dirty = False
 
         # Generate secret key if not set
         if not self.config['security'].get('secret_key'):
             self.config['security']['secret_key'] = secrets.token_hex(32)
-            self.save()
+            dirty = True
             print("✓ Generated new secure secret key")
 
         # Migrate old plaintext password to hash if needed
@@ -211,9 +254,13 @@ class Config:
                 plaintext = self.config['admin']['password']
                 self.config['admin']['password_hash'] = self._hash_password(plaintext)
                 del self.config['admin']['password']
-                self.save()
+                dirty = True
                 print("✓ Migrated admin password to secure hash")
 
+        # Persist both mutations with one serialize + write
+        if dirty:
+            self.save()
+
     @staticmethod
     def _hash_password(password: str) -> str:
         """Hash a password using bcrypt"""
@@ -235,39 +282,59 @@ class Config:
             except Exception:
                 return False
         else:
-            # Fallback for plaintext passwords (migration case)
+            # Fallback for plaintext passwords (migration case) - compare in
+            # constant time so response timing doesn't leak prefix matches
             stored = password_hash.replace('plain:', '') if password_hash.startswith('plain:') else password_hash
-            return password == stored
+            # Compare as bytes: compare_digest rejects non-ASCII str input
+            return hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
 
     def verify_admin_password(self, password: str) -> bool:
         """Verify the admin password"""
+        # A login POST can arrive without a password field at all
+        if not isinstance(password, str):
+            return False
+
         password_hash = self.config.get('admin', {}).get('password_hash', '')
-        return self._verify_password(password, password_hash)
+
+        digest = hashlib.sha256(password.encode('utf-8')).digest()
+        if self._verify_cache is not None:
+            cached_digest, cached_hash = self._verify_cache
+            if cached_hash == password_hash and hmac.compare_digest(digest, cached_digest):
+                return True
+
+        ok = self._verify_password(password, password_hash)
+        if ok:
+            self._verify_cache = (digest, password_hash)
+
+        # Upgrade pre-bcrypt plaintext entries the first time they verify
+        if ok and BCRYPT_AVAILABLE and password_hash.startswith('plain:'):
+            self.config['admin']['password_hash'] = self._hash_password(password)
+            self.save()
+
+        return ok
 
     def get_secret_key(self) -> str:
         """Get the secret key for Flask sessions"""
-        return self.config.get('security', {}).get('secret_key', 'fallback-key-change-me')
+        return self._secret_key
 
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file or create default"""
-        # First check if config file exists
-        if self.config_path.exists():
-            try:
-                with open(self.config_path, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading config: {e}")
-                return self._create_default_config()
-        else:
+        # EAFP: open directly rather than stat-then-open, which costs an
+        # extra syscall and races with concurrent file creation
+        try:
+            return _json_loads(self.config_path.read_bytes())
+        except FileNotFoundError:
             # Check if we have environment variables (legacy setup)
             if os.getenv('CONTAINER_NAME'):
                 return self._migrate_from_env()
-            else:
-                return self._create_default_config()
+            return self._create_default_config()
+        except Exception as e:
+            print(f"Error loading config: {e}")
+            return self._create_default_config()
 
     def _create_default_config(self) -> Dict[str, Any]:
         """Create default configuration"""
-        config = self.DEFAULT_CONFIG.copy()
+        config = self._make_default()
 
         # Set admin credentials from environment if available
         config['admin']['username'] = os.getenv('ADMIN_USER', 'admin')
@@ -277,7 +344,7 @@ class Config:
 
     def _migrate_from_env(self) -> Dict[str, Any]:
         """Migrate from environment variables to config file"""
-        config = self.DEFAULT_CONFIG.copy()
+        config = self._make_default()
 
         config['setup_completed'] = True
         config['server']['container_name'] = os.getenv('CONTAINER_NAME', '')
@@ -298,12 +365,29 @@ class Config:
 
     def save(self) -> bool:
         """Save configuration to file"""
+        self._rebuild_flat()
         try:
+            data = _json_dumps(self.config)
+
+            # Several callers save unconditionally (e.g. re-submitting the
+            # settings form with nothing changed); skip the disk write and
+            # fsync when the serialized config matches the last one written
+            if data == self._saved_bytes and self.config_path.exists():
+                return True
+
             # Ensure directory exists
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            # Write to a temp file and atomically swap it in, so a crash
+            # mid-write can't leave a truncated config (which would wipe
+            # the admin credentials on next boot)
+            tmp_path = self.config_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
+            self._saved_bytes = data
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
@@ -360,11 +444,23 @@ class Config:
         # Hash new password if provided
         if 'password' in admin_config and admin_config['password']:
             self.config['admin']['password_hash'] = self._hash_password(admin_config['password'])
+            self._verify_cache = None
 
         return self.save()
 
+    def update_map_config(self, map_config: Dict[str, Any]) -> bool:
+        """Update map server settings"""
+        self.config['map'] = map_config
+        return self.save()
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key (supports dot notation)"""
+        # Leaf values come straight from the precomputed flat view
+        if key in self._flat:
+            return self._flat[key]
+
+        # Keys naming a subtree (e.g. 'server') aren't in the flat map;
+        # walk the nested dicts as before
         keys = key.split('.')
         value = self.config
         for k in keys:
@@ -376,15 +472,17 @@ class Config:
 
     def get_server_config(self) -> Dict[str, str]:
         """Get server configuration"""
-        return self.config.get('server', {})
+        return self._server
 
     def get_admin_config(self) -> Dict[str, str]:
         """Get admin configuration"""
-        return self.config.get('admin', {})
+        return self._admin
 
     def reset(self) -> bool:
         """Reset configuration to defaults"""
         self.config = self._create_default_config()
+        self._server = self.config.setdefault('server', {})
+        self._admin = self.config.setdefault('admin', {})
         return self.save()
 
 
@@ -2,8 +2,33 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
+import itertools
+import logging
+import re
 import json
 import os
+import shutil
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Optional fast JSON, same pattern as config.py: byte-oriented helpers
+# with a stdlib fallback, keeping the indent so the file stays readable
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2).encode('utf-8')
 
 # Common safe Minecraft commands for scheduled tasks
 SAFE_COMMANDS = [
@@ -14,6 +39,17 @@ SAFE_COMMANDS = [
     'xp', 'experience', 'enchant', 'scoreboard', 'team'
 ]
 
+# Precomputed once. The safe-command check is a single compiled
+# alternation anchored at the start; the \b keeps 'op' from matching
+# 'opendoor' (the old prefix scan accepted it). Longest-first ordering
+# so e.g. 'teleport' wins over 'tp'-style shorter overlaps. A frozenset
+# intersection replaces one substring scan per dangerous character.
+SAFE_RE = re.compile(
+    r'^(?:' + '|'.join(re.escape(c) for c in sorted(SAFE_COMMANDS, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+DANGEROUS_CHARS = frozenset(';|`$><\\\n\r')
+
 class TaskScheduler:
     def __init__(self, bedrock_client):
         self.scheduler = BackgroundScheduler()
@@ -22,162 +58,252 @@ class TaskScheduler:
         os.makedirs('data', exist_ok=True)
         self.tasks_file = 'data/scheduled_tasks.json'
         self.tasks = self.load_tasks()
+        # Write-behind state: mutations mark the tasks dirty and a short
+        # timer coalesces bursts (e.g. several toggles in a row) into one
+        # disk write
+        self._write_lock = threading.Lock()
+        self._write_timer = None
+        self._dirty = False
+        # Triggers keyed by schedule signature; tasks sharing a schedule
+        # (and re-toggles of the same task) reuse one parsed trigger
+        self._trigger_cache = {}
+        # Millisecond-seeded monotonic counter: two add_task calls in the
+        # same second no longer collide on the same id (which silently
+        # overwrote the first task)
+        self._id_counter = itertools.count(int(time.time() * 1000))
+        # Secondary index for O(1) lookup by display name
+        self._by_name = {task['name']: task_id for task_id, task in self.tasks.items()}
 
     def start(self):
         """Start the scheduler"""
-        self.scheduler.start()
-        # Reload existing tasks
+        # Register persisted tasks before starting: jobs added to a stopped
+        # scheduler are queued and applied in one pass on start(), instead
+        # of waking the scheduler thread once per add_job
         for task_id, task in self.tasks.items():
             if task.get('enabled', True):
                 self._schedule_task(task_id, task)
+        self.scheduler.start()
 
     def stop(self):
-        """Stop the scheduler"""
-        self.scheduler.shutdown()
+        """Stop the scheduler and flush any pending task write"""
+        # Guard: task mutations (and so pending writes) can exist even when
+        # the scheduler itself was never started (RUN_SCHEDULER=0 workers)
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        with self._write_lock:
+            if self._write_timer is not None:
+                self._write_timer.cancel()
+                self._write_timer = None
+        self._flush_tasks()
 
     def load_tasks(self):
         """Load tasks from JSON file"""
         if os.path.exists(self.tasks_file):
             try:
-                with open(self.tasks_file, 'r') as f:
-                    return json.load(f)
+                with open(self.tasks_file, 'rb') as f:
+                    return _json_loads(f.read())
             except Exception as e:
-                print(f"[Scheduler] Error loading tasks: {e}")
+                log.error("Error loading tasks: %s", e)
                 return {}
         return {}
 
     def save_tasks(self):
-        """Save tasks to JSON file"""
-        with open(self.tasks_file, 'w') as f:
-            json.dump(self.tasks, f, indent=2)
+        """Queue a write of the tasks file.
+
+        The actual write happens at most once per debounce window, so a
+        burst of mutations serializes and hits the disk once instead of
+        once per call. stop() flushes whatever is still pending.
+        """
+        with self._write_lock:
+            self._dirty = True
+            if self._write_timer is None:
+                timer = threading.Timer(0.5, self._flush_tasks)
+                timer.daemon = True
+                timer.start()
+                self._write_timer = timer
+
+    def _flush_tasks(self):
+        """Write the tasks dict to disk via a temp file + atomic rename"""
+        with self._write_lock:
+            self._write_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            data = _json_dumps(self.tasks)
+
+        tmp_path = self.tasks_file + '.tmp'
+        try:
+            # Rename over the target so a crash mid-write can't leave a
+            # truncated file that load_tasks would silently treat as empty
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._rotate_backup()
+            os.replace(tmp_path, self.tasks_file)
+        except Exception as e:
+            log.error("Error saving tasks: %s", e)
+
+    def _rotate_backup(self):
+        """Keep the last few task snapshots in data/backups"""
+        try:
+            if not os.path.exists(self.tasks_file):
+                return
+            backup_dir = 'data/backups'
+            os.makedirs(backup_dir, exist_ok=True)
+            # Copy rather than move: the live file must stay in place until
+            # the new snapshot is renamed over it, so a crash between the
+            # two steps never leaves the tasks file missing
+            shutil.copy(self.tasks_file,
+                        os.path.join(backup_dir, f'scheduled_tasks.{int(time.time() * 1000)}.json'))
+
+            # Prune beyond the newest 5 (names sort by timestamp)
+            snapshots = sorted(f for f in os.listdir(backup_dir)
+                               if f.startswith('scheduled_tasks.') and f.endswith('.json'))
+            for old in snapshots[:-5]:
+                os.remove(os.path.join(backup_dir, old))
+        except Exception as e:
+            log.error("Error rotating task snapshots: %s", e)
 
     def _is_safe_command(self, command):
         """Validate that command is safe to execute"""
         cmd = command.strip()
-        cmd_lower = cmd.lower()
 
         # Check for shell injection attempts
-        dangerous_chars = [';', '|', '`', '$', '>', '<', '\\', '\n', '\r']
-        for char in dangerous_chars:
-            if char in cmd:
-                print(f"[Scheduler] Blocked: command contains dangerous character '{char}'")
-                return False
+        if not DANGEROUS_CHARS.isdisjoint(cmd):
+            log.warning("Blocked: command contains dangerous character")
+            return False
 
         # Check if command starts with any safe command
-        for safe_cmd in SAFE_COMMANDS:
-            if cmd_lower.startswith(safe_cmd.lower()):
-                return True
-
-        return False
+        return SAFE_RE.match(cmd) is not None
 
-    def _execute_task(self, task_id):
+    def _execute_task(self, task_id, task):
         """Execute a scheduled task"""
-        task = self.tasks.get(task_id)
-        if not task:
+        # The job closes over the task dict from schedule time; cross-check
+        # it is still the registered one so a fire racing a removal (or a
+        # re-add reusing the id) is dropped instead of acting on stale data
+        if self.tasks.get(task_id) is not task:
             return
 
-        print(f"[Scheduler] Executing task: {task['name']}")
+        log.info("Executing task: %s", task['name'])
 
         # Execute the command(s)
         command = task['command']
 
-        # Check for special @backup action
+        # Check for special @backup action (_execute_backup records
+        # last_run and saves itself)
         if command.strip().lower() == '@backup':
             self._execute_backup(task)
-            task['last_run'] = datetime.now().isoformat()
-            self.save_tasks()
             return
 
-        # Support multiple commands separated by ' && '
+        # Support multiple commands separated by ' && '. Safe subcommands
+        # are batched into a single remote round-trip (a 10-item welcome
+        # kit is one SSH exchange instead of ten).
         if ' && ' in command:
-            commands = command.split(' && ')
-            for cmd in commands:
+            safe_commands = []
+            for cmd in command.split(' && '):
                 cmd = cmd.strip()
-                if cmd:
-                    if self._is_safe_command(cmd):
-                        self.bedrock_client.send_command(cmd)
-                    else:
-                        print(f"[Scheduler] Warning: Skipped potentially unsafe command: {cmd}")
+                if not cmd:
+                    continue
+                if self._is_safe_command(cmd):
+                    safe_commands.append(cmd)
+                else:
+                    log.warning("Skipped potentially unsafe command: %s", cmd)
+            if safe_commands:
+                self.bedrock_client.send_commands(safe_commands)
         else:
             if self._is_safe_command(command):
                 self.bedrock_client.send_command(command)
             else:
-                print(f"[Scheduler] Warning: Skipped potentially unsafe command: {command}")
+                log.warning("Skipped potentially unsafe command: %s", command)
 
     def _execute_backup(self, task):
         """Create an automatic backup"""
+        now = datetime.now()
         try:
             # Generate backup name with timestamp
-            backup_name = f"auto_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            backup_name = f"auto_{now.strftime('%Y%m%d_%H%M%S')}"
 
-            print(f"[Scheduler] Creating automatic backup: {backup_name}")
+            log.info("Creating automatic backup: %s", backup_name)
 
             # Save world first
             self.bedrock_client.send_command('save-all')
 
             # Wait a moment for save to complete
-            import time
             time.sleep(2)
 
             # Create the backup
             result = self.bedrock_client.create_backup(backup_name)
 
             if result.get('success'):
-                print(f"[Scheduler] Backup created successfully: {result.get('message', backup_name)}")
+                log.info("Backup created successfully: %s", result.get('message', backup_name))
             else:
-                print(f"[Scheduler] Backup failed: {result.get('error', 'Unknown error')}")
+                log.error("Backup failed: %s", result.get('error', 'Unknown error'))
 
         except Exception as e:
-            print(f"[Scheduler] Error creating backup: {e}")
+            log.error("Error creating backup: %s", e)
 
         # Update last run
-        task['last_run'] = datetime.now().isoformat()
+        task['last_run'] = now.isoformat()
         self.save_tasks()
 
     def _schedule_task(self, task_id, task):
         """Schedule a task with APScheduler"""
         schedule_type = task.get('schedule_type', 'interval')
 
+        # Event-driven tasks are persisted here for status/disable handling
+        # but fired by an external trigger (e.g. the player-join watcher),
+        # so no APScheduler job is registered
+        if schedule_type == 'event':
+            return
+
         try:
+            trigger = None
+
             if schedule_type == 'interval':
                 # Interval-based (every X minutes/hours)
                 minutes = task.get('interval_minutes', 60)
-                self.scheduler.add_job(
-                    self._execute_task,
-                    trigger=IntervalTrigger(minutes=minutes),
-                    args=[task_id],
-                    id=task_id,
-                    replace_existing=True
-                )
+                key = ('interval', minutes)
+                trigger = self._trigger_cache.get(key)
+                if trigger is None:
+                    trigger = IntervalTrigger(minutes=minutes)
+                    self._trigger_cache[key] = trigger
 
             elif schedule_type == 'cron':
                 # Cron-based (specific times)
                 cron_str = task.get('cron', '0 * * * *')  # Default: every hour
-                parts = cron_str.split()
-
-                if len(parts) == 5:
-                    minute, hour, day, month, day_of_week = parts
-                    self.scheduler.add_job(
-                        self._execute_task,
-                        trigger=CronTrigger(
+                key = ('cron', cron_str)
+                trigger = self._trigger_cache.get(key)
+                if trigger is None:
+                    parts = cron_str.split()
+                    if len(parts) == 5:
+                        minute, hour, day, month, day_of_week = parts
+                        trigger = CronTrigger(
                             minute=minute,
                             hour=hour,
                             day=day,
                             month=month,
                             day_of_week=day_of_week
-                        ),
-                        args=[task_id],
-                        id=task_id,
-                        replace_existing=True
-                    )
+                        )
+                        self._trigger_cache[key] = trigger
 
-            print(f"[Scheduler] Scheduled task: {task['name']}")
+            if trigger is not None:
+                self.scheduler.add_job(
+                    self._execute_task,
+                    trigger=trigger,
+                    args=[task_id, task],
+                    id=task_id,
+                    replace_existing=True
+                )
+
+            log.info("Scheduled task: %s", task['name'])
         except Exception as e:
-            print(f"[Scheduler] Error scheduling task {task_id}: {e}")
+            log.error("Error scheduling task %s: %s", task_id, e)
 
-    def add_task(self, name, command, schedule_type, **kwargs):
-        """Add a new scheduled task"""
-        task_id = f"task_{int(datetime.now().timestamp())}"
+    def add_task(self, name, command, schedule_type, metadata=None, **kwargs):
+        """Add a new scheduled task (metadata is opaque caller data persisted
+        with the task, e.g. the parsed welcome-kit items)"""
+        task_id = f"task_{next(self._id_counter)}"
 
         task = {
             'name': name,
@@ -187,6 +313,8 @@ class TaskScheduler:
             'created': datetime.now().isoformat(),
             'last_run': None
         }
+        if metadata is not None:
+            task['metadata'] = metadata
 
         if schedule_type == 'interval':
             task['interval_minutes'] = kwargs.get('interval_minutes', 60)
@@ -194,6 +322,7 @@ class TaskScheduler:
             task['cron'] = kwargs.get('cron', '0 * * * *')
 
         self.tasks[task_id] = task
+        self._by_name[name] = task_id
         self.save_tasks()
         self._schedule_task(task_id, task)
 
@@ -202,14 +331,18 @@ class TaskScheduler:
     def remove_task(self, task_id):
         """Remove a scheduled task"""
         if task_id in self.tasks:
-            # Remove from scheduler
-            try:
-                self.scheduler.remove_job(task_id)
-            except Exception as e:
-                print(f"[Scheduler] Error removing job {task_id}: {e}")
+            # Remove from scheduler (event tasks never registered a job)
+            if self.tasks[task_id].get('schedule_type') != 'event':
+                try:
+                    self.scheduler.remove_job(task_id)
+                except Exception as e:
+                    log.warning("Error removing job %s: %s", task_id, e)
 
-            # Remove from tasks dict
+            # Remove from tasks dict and the name index
+            name = self.tasks[task_id].get('name')
             del self.tasks[task_id]
+            if self._by_name.get(name) == task_id:
+                del self._by_name[name]
             self.save_tasks()
             return True
         return False
@@ -217,16 +350,18 @@ class TaskScheduler:
     def toggle_task(self, task_id, enabled):
         """Enable or disable a task"""
         if task_id in self.tasks:
-            self.tasks[task_id]['enabled'] = enabled
+            task = self.tasks[task_id]
+            task['enabled'] = enabled
             self.save_tasks()
 
             if enabled:
-                self._schedule_task(task_id, self.tasks[task_id])
-            else:
+                self._schedule_task(task_id, task)
+            elif task.get('schedule_type') != 'event':
+                # Event tasks never registered an APScheduler job
                 try:
                     self.scheduler.remove_job(task_id)
                 except Exception as e:
-                    print(f"[Scheduler] Error removing job {task_id}: {e}")
+                    log.warning("Error removing job %s: %s", task_id, e)
             return True
         return False
 
@@ -237,3 +372,10 @@ class TaskScheduler:
     def get_task(self, task_id):
         """Get a specific task"""
         return self.tasks.get(task_id)
+
+    def get_task_by_name(self, name):
+        """Look up a task by display name. Returns (task_id, task) or (None, None)."""
+        task_id = self._by_name.get(name)
+        if task_id is None:
+            return None, None
+        return task_id, self.tasks[task_id]